@@ -0,0 +1,211 @@
+import sys
+import os
+import gc
+import json
+import time
+import random
+import argparse
+import itertools
+import importlib.util
+import tracemalloc
+import numpy as np
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic.services import WordSimilarityService
+from game_logic.vector_db import VectorDB
+from game_logic.engine import GameSession, get_bot_class
+
+# Benchmarks for the similarity and nearest-neighbour hot paths.
+#
+#   python benchmarks/bench.py --save baseline.json
+#   python benchmarks/bench.py --baseline baseline.json --threshold 1.25
+#
+# Every case reports p50/p95/p99/mean in milliseconds and the peak traced
+# memory of one run in KiB. With --baseline, cases whose p50, p95 or peak
+# memory grew by more than the threshold are listed and the exit code is 1.
+
+def measure(fn, repeats=50, warmup=3, setup=None):
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    times = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(times, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            "mean_ms": float(np.mean(times)), "runs": repeats, "peak_kib": peak / 1024}
+
+def model_available():
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+# ─── Cases ───────────────────────────────────────────────────────────────────
+
+def bench_similarity(language, results):
+    service = WordSimilarityService()
+    if not model_available():
+        print("  skipping compute_similarity: sentence_transformers not installed")
+        return
+    # Misses must reach the model, not the on-disk cache (which they would also fill)
+    WordSimilarityService.disk_cache = False
+
+    def cold():
+        service.unload(language)
+        service.clear_cache(language)
+        service.compute_similarity("doctor", "medicine", language)
+    results["compute_similarity/cold_model"] = measure(cold, repeats=3, warmup=0)
+
+    words = VectorDB().get_word_list(language)[:2000] or ["doctor", "medicine"]
+    pairs = iter(random.Random(0).sample(words, min(len(words), 2000)) * 10)
+    results["compute_similarity/warm_model_miss"] = measure(
+        lambda: service.compute_similarity(next(pairs), "doctor", language),
+        setup=lambda: service.clear_cache(language))
+    results["compute_similarity/warm_model_cached"] = measure(
+        lambda: service.compute_similarity("doctor", "medicine", language), repeats=500)
+
+def bench_load_data(language, results):
+    db = VectorDB()
+    results["vector_db/load_data_cold"] = measure(
+        lambda: db.load_data(language), repeats=10, warmup=1, setup=lambda: db.unload(language))
+
+def bench_nearest(language, results, top_ks=(1, 10, 100, 1000)):
+    db = VectorDB()
+    matrix = db.get_matrix(language)
+    if matrix is None:
+        return
+    words = db.get_word_list(language)
+    rng = np.random.default_rng(0)
+
+    queries = itertools.cycle(np.asarray(matrix[rng.integers(0, len(matrix), 200)]))
+
+    sizes = sorted({n for n in (1000, 10000, 100000) if n < len(matrix)} | {len(matrix)})
+    for size in sizes:
+        # Serve the first `size` rows as their own language to vary vocabulary size
+        name = f"bench-{size}"
+        db.set_data(name, words[:size], matrix[:size])
+        for top_k in top_ks:
+            if top_k <= size:
+                results[f"vector_db/get_nearest_word/n={size}/top_k={top_k}"] = measure(
+                    lambda: db.get_nearest_word(next(queries), name, top_k=top_k), repeats=100)
+        db.unload(name)
+
+def _history(session, n):
+    pool = [w for w in session.target_pool if w in session.vocabulary]
+    return [pool[i % len(pool)] for i in range(n)]
+
+def bench_make_guess(language, results, history_lengths=(0, 10, 100, 500)):
+    random.seed(0)
+    for n in history_lengths:
+        session = GameSession(language=language, preload_model=False)
+        session.add_player("bench")
+        for word in _history(session, n):
+            session.make_guess(0, word)
+        probe = iter(_history(session, n + 200)[n:] * 5)
+        results[f"engine/make_guess/history={n}"] = measure(lambda: session.make_guess(0, next(probe)))
+
+def bench_bots(language, results, history_lengths=(5, 50)):
+    session = GameSession(language=language, preload_model=False)
+    db = VectorDB()
+    goal = db.get_word_vector(session.goal_word, language)
+    if goal is None:
+        return
+
+    for difficulty in ("noob", "pro", "hacker"):
+        bot_class = get_bot_class(difficulty)
+        for n in history_lengths:
+            words = _history(session, n)
+            guesses = []
+            for w in words:
+                v = db.get_word_vector(w, language)
+                guesses.append({"word": w, "similarity": float(v @ goal) * 100 if v is not None else 0.0})
+            # A fresh bot per run: the hacker's solver would otherwise have
+            # folded these guesses in already and return at once
+            bots = []
+            def new_bot():
+                bots[:] = [bot_class(language)]
+            if difficulty == "hacker":
+                call = lambda: bots[0].get_next_guess(guesses, {"a": 1, "b": 0}, "sports", "b")
+            else:
+                call = lambda: bots[0].get_next_guess(guesses)
+            random.seed(0)
+            np.random.seed(0)
+            results[f"bots/{difficulty}/history={n}"] = measure(call, repeats=30, setup=new_bot)
+
+CASES = {
+    "similarity": bench_similarity,
+    "load_data": bench_load_data,
+    "nearest": bench_nearest,
+    "make_guess": bench_make_guess,
+    "bots": bench_bots,
+}
+
+# ─── Baseline comparison ─────────────────────────────────────────────────────
+
+def compare(results, baseline, threshold, min_delta_ms=0.05):
+    """Timing changes smaller than min_delta_ms are treated as noise."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "peak_kib"):
+            before, after = previous.get(metric), current.get(metric)
+            if metric.endswith("_ms") and after is not None and before is not None and after - before < min_delta_ms:
+                continue
+            if before and after and after > before * threshold:
+                regressions.append((name, metric, before, after))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the similarity and nearest-neighbour hot paths.")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--save", default=None, help="write results as JSON")
+    parser.add_argument("--baseline", default=None, help="compare against a saved JSON result")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown/memory growth factor")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore timing changes below this")
+    args = parser.parse_args()
+
+    results = {}
+    for case in args.cases:
+        print(f"Running {case}...")
+        CASES[case](args.language, results)
+
+    print(f"\n{'case':<52}{'p50':>9}{'p95':>9}{'p99':>9}{'peak KiB':>10}")
+    for name, r in results.items():
+        print(f"{name:<52}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}{r['peak_kib']:>10.1f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({"language": args.language, "results": results}, f, indent=2)
+        print(f"\nWrote {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over x{args.threshold}:")
+            for name, metric, before, after in regressions:
+                print(f"  {name} {metric}: {before:.3f} -> {after:.3f}")
+            sys.exit(1)
+        print(f"\nNo regressions over x{args.threshold} against {args.baseline}.")
+
+if __name__ == "__main__":
+    main()
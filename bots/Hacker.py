@@ -2,6 +2,115 @@ import numpy as np
 import random
 from game_logic.services import WordSimilarityService
 from game_logic.vector_db import VectorDB
+from game_logic.metrics import timed
+
+
+def to_unit_scale(similarities):
+    """Similarities as cosines; scores on the 0-100 scale are divided by 100."""
+    similarities = np.asarray(similarities, dtype=np.float32)
+    if len(similarities) and np.abs(similarities).max() > 1.0:
+        return similarities / 100.0
+    return similarities
+
+
+class CandidateSolver:
+    """
+    Keeps the set of words that could still be the target. Every observed
+    (word, similarity) costs one matrix-vector product over the remaining
+    candidates: those whose similarity to the guessed word differs from the
+    observed one by more than `tolerance` are dropped.
+
+    An observation no candidate agrees with (a word scored by the model rather
+    than the stored embeddings, say) does not filter; it only adds to each
+    candidate's error, and the lowest-error candidate is guessed.
+    """
+
+    def __init__(self, vector_search, language, tolerance=0.01):
+        self.vector_search = vector_search
+        self.language = language
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        self._matrix = None
+        self._pack = None
+        self._rows = None       # candidate rows of the matrix
+        self._error = None      # accumulated |expected - observed| per candidate
+        self._observed = set()  # lowercased words already folded in
+        self._percent = False
+        self.eliminated = False  # True once an observation actually filtered
+        self.agreed = False      # whether the newest observation matched any remaining candidate
+
+    def _to_unit_scale(self, similarities):
+        """
+        Like to_unit_scale(), but once a game's scores were seen on the 0-100
+        scale, later ones are too (even if all of them are <= 1).
+        """
+        similarities = np.asarray(similarities, dtype=np.float32)
+        if len(similarities) and np.abs(similarities).max() > 1.0:
+            self._percent = True
+        return similarities / 100.0 if self._percent else similarities
+
+    def update(self, guesses, pack=None):
+        """Folds the guesses not seen yet into the candidate set; a pack limits the initial candidates."""
+        matrix = self.vector_search.get_matrix(self.language)
+        if matrix is None:
+            return
+        words = [g["word"].lower() for g in guesses]
+        # Guesses only ever get added during a game, in whatever order the
+        # caller lists them; one that went missing means a new game
+        restart = not self._observed.issubset(words)
+        if restart or matrix is not self._matrix or pack != self._pack:
+            # New or reloaded embeddings, another pack, or another game's guesses: start over
+            self.reset()
+            self._matrix = matrix
+            self._pack = pack
+            self._rows = np.arange(len(matrix))
+            if pack and pack != "mixed":
+                pack_rows = self.vector_search.get_pack_rows(pack, self.language)
+                if len(pack_rows):
+                    self._rows = pack_rows
+            self._error = np.zeros(len(self._rows), dtype=np.float32)
+
+        similarities = self._to_unit_scale([g["similarity"] for g in guesses])
+        new = []
+        for i, word in enumerate(words):
+            if word not in self._observed:
+                self._observed.add(word)
+                new.append(i)
+        if not new:
+            return
+
+        rows = self.vector_search.get_word_rows([guesses[i]["word"] for i in new], self.language)
+        similarities = similarities[new]
+        for row, observed in zip(rows, similarities):
+            if row < 0:
+                continue
+            vector = matrix[row]
+            expected = matrix @ vector if len(self._rows) == len(matrix) else matrix[self._rows] @ vector
+            error = np.abs(expected - observed)
+            keep = error <= self.tolerance
+            self.agreed = bool(keep.any())
+            if self.agreed:
+                self._rows, self._error = self._rows[keep], self._error[keep] + error[keep]
+                self.eliminated = True
+            else:
+                self._error += error
+
+    def best_candidate(self, guessed_words):
+        """The remaining candidate with the lowest error that has not been guessed, or None."""
+        if self._rows is None or not len(self._rows):
+            return None
+        words = self.vector_search.get_word_list(self.language)
+        for i in np.argsort(self._error, kind="stable"):
+            word = words[self._rows[i]]
+            if word not in guessed_words:
+                return word
+        return None
+
+    @property
+    def n_candidates(self):
+        return 0 if self._rows is None else len(self._rows)
 
 
 class HackerBot:
@@ -9,15 +118,28 @@ class HackerBot:
         self.language = language
         self.similarity_service = WordSimilarityService()
         self.vector_search = VectorDB()
+        self.solver = CandidateSolver(self.vector_search, language)
 
+    @timed("bot_decision_seconds", bot="hacker")
     def get_next_guess(self, guesses, scoreboard, pack, bot_id):
         """
         guesses:    List of dicts {"word": str, "similarity": float}
         scoreboard: dict {player_id: score}
-        pack:       "sports" | "history" | "science" | "computer_science" | "mixed"
+        pack:       "sports" | "history" | "science" | "computer_science" | "mixed";
+                    nearest-word searches stay within its words
         bot_id:     identifier of this bot in the scoreboard
         Returns the bot's next guess as a string.
         """
+        self.pack = pack
+        if not guesses:
+            self.solver.reset()
+            return self._themed_guess(pack, guesses)
+
+        # Step 0: Work out the target from the observed similarities
+        word = self._solve(guesses)
+        if word:
+            return word
+
         # Step 1: Determine mode
         mode = self._choose_strategy(scoreboard, bot_id)
 
@@ -64,18 +186,31 @@ class HackerBot:
         if len(guesses) < 5:
             return False
             
-        recent_best = max([g["similarity"] for g in guesses[-3:]], default=0)
-        overall_best = max([g["similarity"] for g in guesses[:-3]], default=0)
+        similarities = to_unit_scale([g["similarity"] for g in guesses])
+        recent_best = similarities[-3:].max()
+        overall_best = similarities[:-3].max()
         
-        # If we haven't beaten the previous best by at least 0.5 in 3 turns, we are stuck
-        # (Assuming similarity is 0-100 scale)
-        if recent_best <= overall_best + 0.5:
-             # Also check if the best similarity is low (< 40). 
-             if overall_best < 40:
+        # If we haven't beaten the previous best by at least 0.005 in 3 turns, we are stuck
+        if recent_best <= overall_best + 0.005:
+             # Also check if the best similarity is low (< 0.4). 
+             if overall_best < 0.4:
                  return True
                  
         return False
 
+    # ─── Strategy 0: Candidate Elimination ──────────────────────────────────
+
+    def _solve(self, guesses):
+        """
+        Best remaining candidate once an observation has narrowed the field, else None.
+        Also None when the newest observation fits no candidate (a goal scored by
+        the model rather than a stored row, say), so the other strategies take over.
+        """
+        self.solver.update(guesses, self.pack)
+        if not self.solver.eliminated or not self.solver.agreed or not self.solver.n_candidates:
+            return None
+        return self.solver.best_candidate({g["word"].lower() for g in guesses})
+
     # ─── Strategy Selection ───────────────────────────────────────────────────
 
     def _choose_strategy(self, scoreboard, bot_id):
@@ -88,25 +223,24 @@ class HackerBot:
 
     # ─── Strategy 1: Different Angle ─────────────────────────────────────────
 
-    def _find_different_angle(self, guesses):
+    def _find_different_angle(self, guesses, top_k=2000, block=256):
         """
         Find a candidate near the best guess that is dissimilar
         to all high-scoring guesses (cosine sim < 0.6).
         """
-        high_guesses = [g for g in guesses if g["similarity"] >= 50]
+        similarities = to_unit_scale([g["similarity"] for g in guesses])
+        high_guesses = [g for g, sim in zip(guesses, similarities) if sim >= 0.5]
         if not high_guesses:
             return None
 
-        guess_vectors = []
-        for g in high_guesses:
-            v = self.vector_search.get_word_vector(g["word"], self.language)
-            if v is not None:
-                guess_vectors.append(v)
+        guess_vectors, _ = self.vector_search.get_word_vectors(
+            [g["word"] for g in high_guesses], self.language
+        )
 
-        if not guess_vectors:
+        if len(guess_vectors) == 0:
             return None
 
-        best = max(guesses, key=lambda x: x["similarity"])
+        best = guesses[int(np.argmax(similarities))]
         v_best = self.vector_search.get_word_vector(best["word"], self.language)
         if v_best is None:
             return None
@@ -114,59 +248,38 @@ class HackerBot:
         guessed_words = {g["word"].lower() for g in guesses}
 
         # Search broad neighborhood of the best guess, but looking for DIFFERENT words
-        top_k = 100
-        while True:
-            candidates = self.vector_search.get_nearest_word(
-                v_best, self.language, top_k=top_k
-            )
-            if not candidates:
-                return None
-
-            for candidate in candidates:
-                if candidate.lower() in guessed_words:
-                    continue
-                    
-                v = self.vector_search.get_word_vector(candidate, self.language)
-                if v is None:
-                    continue
-                
-                # Check orthogonality/dissimilarity to other high scoring words
-                is_different = True
-                for gv in guess_vectors:
-                    sim = np.dot(v, gv)
-                    if sim > 0.6: # If >0.6 similarity to any other good guess, it's not "different" enough
-                        is_different = False
-                        break
-                
-                if is_different:
-                    return candidate
+        rows, _ = self.vector_search.search_rows(
+            v_best, self.language, top_k=top_k, exclude=guessed_words, pack=self.pack
+        )
+        if not len(rows):
+            return None
 
-            # No valid candidate found in this range — expand
-            if top_k >= 2000:
-                return None
-            top_k *= 2
+        # (candidates x high guesses) products, a block at a time so an early
+        # hit stops the scan; a candidate over 0.6 to any good guess is not
+        # "different" enough. Candidates are sorted by closeness to the best guess.
+        matrix = self.vector_search.get_matrix(self.language)
+        words = self.vector_search.get_word_list(self.language)
+        for start in range(0, len(rows), block):
+            is_different = ~np.any(matrix[rows[start:start + block]] @ guess_vectors.T > 0.6, axis=1)
+            first = np.argmax(is_different)
+            if is_different[first]:
+                return words[rows[start + first]]
+
+        return None
 
     # ─── Strategy 2: Play Around Target ──────────────────────────────────────
 
     def _play_around_target(self, best_vector, guesses):
         """Exploit the high-similarity region by guessing words close to current best."""
         guessed_words = {g["word"].lower() for g in guesses}
-        top_k = 10
+        candidates, _ = self.vector_search.search(
+            best_vector, self.language, top_k=1, exclude=guessed_words, pack=self.pack
+        )
 
-        while True:
-            candidates = self.vector_search.get_nearest_word(
-                best_vector, self.language, top_k=top_k
-            )
-            if not candidates:
-                return None
-
-            for candidate in candidates:
-                if candidate.lower() not in guessed_words:
-                    return candidate
+        if not candidates:
+            return None
 
-            if top_k >= 2000:
-                return None
-            top_k *= 2
+        return candidates[0]
 
     # ─── Strategy 3: Theme-Based Guessing ────────────────────────────────────
 
@@ -193,35 +306,29 @@ class HackerBot:
         Full Pro Bot logic — weighted target estimation using all guesses.
         Re-implemented here to avoid dependency complications.
         """
-        vectors = []
-        scores = []
-        for g in guesses:
-            v = self.vector_search.get_word_vector(g["word"], self.language)
-            if v is not None:
-                vectors.append(v)
-                scores.append(g["similarity"])
-
-        if len(vectors) < 2:
+        vectors, found = self.vector_search.get_word_vectors(
+            [g["word"] for g in guesses], self.language
+        )
+
+        if len(found) < 2:
             return self._get_random_word()
 
         # Weighted estimate of target position (Simple Pro version)
-        target_estimate = np.zeros_like(vectors[0])
-        for v, s in zip(vectors, scores):
-            weight = (s / 100.0) ** 3
-            target_estimate += v * weight
+        similarities = to_unit_scale([g["similarity"] for g in guesses])
+        target_estimate = (similarities[found] ** 3) @ vectors
 
         norm = np.linalg.norm(target_estimate)
         if norm == 0:
             return self._get_random_word()
         target_estimate /= norm
 
-        best_guess = max(guesses, key=lambda x: x["similarity"])
-        v_best = self.vector_search.get_word_vector(best_guess["word"], self.language)
+        best = int(np.argmax(similarities))
+        v_best = self.vector_search.get_word_vector(guesses[best]["word"], self.language)
         if v_best is None:
             return self._get_random_word()
 
         direction = target_estimate - v_best
-        step_size = (100 - best_guess["similarity"]) / 100
+        step_size = 1.0 - float(similarities[best])
 
         guess_vector = v_best + step_size * direction
         norm = np.linalg.norm(guess_vector)
@@ -234,24 +341,16 @@ class HackerBot:
     # ─── Shared Helpers ───────────────────────────────────────────────────────
 
     def _get_unguessed_nearest(self, guess_vector, guesses):
-        """Find the nearest word not already guessed, expanding search if needed."""
+        """Find the nearest word not already guessed."""
         guessed_words = {g["word"].lower() for g in guesses}
-        top_k = 5
-
-        while True:
-            nearest_words = self.vector_search.get_nearest_word(
-                guess_vector, self.language, top_k=top_k
-            )
-            if not nearest_words:
-                return self._get_random_word()
+        nearest_words, _ = self.vector_search.search(
+            guess_vector, self.language, top_k=1, exclude=guessed_words, pack=self.pack
+        )
 
-            for word in nearest_words:
-                if word.lower() not in guessed_words:
-                    return word
+        if not nearest_words:
+            return self._get_random_word()
 
-            top_k *= 2
-            if top_k > 1000:
-                return self._get_random_word()
+        return nearest_words[0]
 
     def _get_random_word(self):
         """Fallback: pick a random word from the vocabulary."""
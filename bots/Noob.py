@@ -2,6 +2,7 @@ import numpy as np
 import random
 from game_logic.services import WordSimilarityService
 from game_logic.vector_db import VectorDB
+from game_logic.metrics import timed
 
 
 class NoobBot:
@@ -10,11 +11,15 @@ class NoobBot:
         self.similarity_service = WordSimilarityService()
         self.vector_search = VectorDB()
 
-    def get_next_guess(self, guesses):
+    @timed("bot_decision_seconds", bot="noob")
+    def get_next_guess(self, guesses, pack=None):
         """
         guesses: List of dicts {"word": str, "similarity": float}
+        pack:    the game's pack; nearest-word searches stay within its words
+                 (None or "mixed" searches everything)
         Returns the bot's next guess as a string.
         """
+        self.pack = pack
         if len(guesses) < 2:
             return self._get_random_word()
 
@@ -49,27 +54,16 @@ class NoobBot:
         Simulates 'rough' guessing by picking randomly from top results.
         """
         guessed_words = {g["word"].lower() for g in guesses}
-        top_k = 50 
-        
-        while True:
-            nearest_words = self.vector_search.get_nearest_word(
-                guess_vector, self.language, top_k=top_k
-            )
 
-            if not nearest_words:
-                return self._get_random_word()
-            
-            candidates = [w for w in nearest_words if w.lower() not in guessed_words]
-            
-            if candidates:
-                # Pick randomly from top 10 matches to simulate clumsiness
-                return random.choice(candidates[:10]) 
+        # Pick randomly from top 10 unguessed matches to simulate clumsiness
+        candidates, _ = self.vector_search.search(
+            guess_vector, self.language, top_k=10, exclude=guessed_words, pack=self.pack
+        )
 
-            # All returned words were already guessed — expand search
-            top_k *= 2
+        if not candidates:
+            return self._get_random_word()
 
-            if top_k > 10_000:
-                return self._get_random_word()
+        return random.choice(candidates)
 
     def _get_random_word(self):
         """Fallback: pick a random word from the vocabulary."""
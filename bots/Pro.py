@@ -2,6 +2,7 @@ import numpy as np
 import random
 from game_logic.services import WordSimilarityService
 from game_logic.vector_db import VectorDB
+from game_logic.metrics import timed
 
 
 class ProBot:
@@ -10,23 +11,23 @@ class ProBot:
         self.similarity_service = WordSimilarityService()
         self.vector_search = VectorDB()
 
-    def get_next_guess(self, guesses):
+    @timed("bot_decision_seconds", bot="pro")
+    def get_next_guess(self, guesses, pack=None):
         """
         guesses: List of dicts {"word": str, "similarity": float}
+        pack:    the game's pack; nearest-word searches stay within its words
+                 (None or "mixed" searches everything)
         Returns the bot's next guess as a string.
         """
+        self.pack = pack
         if len(guesses) < 2:
             return self._get_random_word()
 
-        vectors = []
-        scores = []
-        for g in guesses:
-            v = self.vector_search.get_word_vector(g["word"], self.language)
-            if v is not None:
-                vectors.append(v)
-                scores.append(g["similarity"])
+        vectors, found = self.vector_search.get_word_vectors(
+            [g["word"] for g in guesses], self.language
+        )
 
-        if len(vectors) < 2:
+        if len(found) < 2:
             return self._get_random_word()
 
         best_guess = max(guesses, key=lambda x: x["similarity"])
@@ -81,19 +82,16 @@ class ProBot:
         if not rest_guesses:
              return self._get_unguessed_nearest(v_best, guesses)
              
-        center_rest = np.zeros_like(v_best)
-        total_weight = 0
-        for g in rest_guesses:
-             v = self.vector_search.get_word_vector(g["word"], self.language)
-             if v is not None:
-                 weight = (g["similarity"] / 100.0) ** 2
-                 center_rest += v * weight
-                 total_weight += weight
+        rest_vectors, found = self.vector_search.get_word_vectors(
+            [g["word"] for g in rest_guesses], self.language
+        )
+        weights = np.array([(rest_guesses[i]["similarity"] / 100.0) ** 2 for i in found])
+        total_weight = weights.sum()
         
         if total_weight == 0:
              return self._get_unguessed_nearest(v_best, guesses)
              
-        center_rest /= total_weight
+        center_rest = (weights @ rest_vectors) / total_weight
         direction = v_best - center_rest
         
         norm_dir = np.linalg.norm(direction)
@@ -112,23 +110,14 @@ class ProBot:
     def _get_unguessed_nearest(self, guess_vector, guesses):
         """Find nearest neighbor not in guesses."""
         guessed_words = {g["word"].lower() for g in guesses}
-        top_k = 5
+        nearest_words, _ = self.vector_search.search(
+            guess_vector, self.language, top_k=1, exclude=guessed_words, pack=self.pack
+        )
 
-        while True:
-            nearest_words = self.vector_search.get_nearest_word(
-                guess_vector, self.language, top_k=top_k
-            )
-
-            if not nearest_words:
-                return self._get_random_word()
-
-            for word in nearest_words:
-                if word.lower() not in guessed_words:
-                    return word
+        if not nearest_words:
+            return self._get_random_word()
 
-            top_k *= 2
-            if top_k > 1000:
-                return self._get_random_word()
+        return nearest_words[0]
 
     def _get_random_word(self):
         """Fallback: pick a random word from the vocabulary."""
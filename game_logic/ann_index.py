@@ -0,0 +1,275 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Approximate nearest neighbour index for VectorDB, in pure NumPy.
+#
+# IVF: rows are clustered with spherical k-means and stored in one inverted
+# list per cluster. A query only scores the rows of the n_probe clusters whose
+# centroids are closest to it.
+# PQ (optional): each row is also compressed to one byte per subspace, so the
+# probed rows can be ranked from a small lookup table. Only a short list of the
+# best is then re-scored exactly against the embedding matrix.
+
+def _spherical_kmeans(data, n_clusters, iterations, rng, chunk_size=65536):
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assign = _assign(data, centroids, chunk_size)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=n_clusters)
+
+        # Re-seed empty clusters from random rows
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+def _assign(data, centroids, chunk_size=65536):
+    assign = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), chunk_size):
+        block = np.asarray(data[start:start + chunk_size], dtype=np.float32)
+        assign[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+def _euclidean_kmeans(data, n_clusters, iterations, rng):
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest_euclidean(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=n_clusters)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+def _nearest_euclidean(data, centroids):
+    # argmin ||x - c||^2 == argmin (||c||^2 - 2 x.c)
+    return np.argmin((centroids ** 2).sum(axis=1) - 2 * data @ centroids.T, axis=1)
+
+
+class IVFIndex:
+    def __init__(self, n_lists=256, n_probe=8, pq_subspaces=0, rerank=256):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.pq_subspaces = pq_subspaces
+        self.rerank = rerank
+        self.centroids = None
+        self.list_rows = None      # row ids grouped by list
+        self.list_offsets = None   # list i is list_rows[list_offsets[i]:list_offsets[i + 1]]
+        self.pq_codebooks = None   # (pq_subspaces, 256, dim // pq_subspaces)
+        self.pq_codes = None       # (n_rows, pq_subspaces) uint8, indexed by row id
+        self.n_rows = None         # rows of the matrix the index was built over
+        self.source = None         # store_signature() of that matrix's store, if saved with one
+
+    def build(self, matrix, iterations=15, sample_size=100000, seed=0):
+        rng = np.random.default_rng(seed)
+        n_rows, dim = matrix.shape
+        self.n_rows = n_rows
+        self.n_lists = min(self.n_lists, n_rows)
+
+        sample_rows = np.sort(rng.choice(n_rows, min(sample_size, n_rows), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+
+        self.centroids = _spherical_kmeans(sample, self.n_lists, iterations, rng)
+        assign = _assign(matrix, self.centroids)
+        self.list_rows = np.argsort(assign, kind='stable').astype(np.int32)
+        self.list_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(assign, minlength=self.n_lists)))
+        ).astype(np.int64)
+
+        if self.pq_subspaces:
+            if dim % self.pq_subspaces:
+                raise ValueError(f"pq_subspaces={self.pq_subspaces} does not divide dimension {dim}")
+            sub_dim = dim // self.pq_subspaces
+            n_codes = min(256, len(sample))
+            self.pq_codebooks = np.empty((self.pq_subspaces, n_codes, sub_dim), dtype=np.float32)
+            self.pq_codes = np.empty((n_rows, self.pq_subspaces), dtype=np.uint8)
+            for j in range(self.pq_subspaces):
+                cols = slice(j * sub_dim, (j + 1) * sub_dim)
+                self.pq_codebooks[j] = _euclidean_kmeans(sample[:, cols], n_codes, iterations, rng)
+                for start in range(0, n_rows, 65536):
+                    block = np.asarray(matrix[start:start + 65536, cols], dtype=np.float32)
+                    self.pq_codes[start:start + 65536, j] = _nearest_euclidean(block, self.pq_codebooks[j])
+        return self
+
+    def shortlist(self, vector, top_k=10, excluded=None, n_probe=None):
+        """
+        Returns candidate row ids for an exact re-score.
+        vector must be normalized; excluded is an optional boolean mask over rows.
+        The number of probed lists is widened until top_k rows remain.
+        """
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        list_order = np.argsort(self.centroids @ vector)[::-1]
+
+        while True:
+            probed = list_order[:n_probe]
+            rows = np.concatenate([
+                self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]] for i in probed
+            ])
+            if excluded is not None:
+                rows = rows[~excluded[rows]]
+            if len(rows) >= top_k or n_probe >= self.n_lists:
+                break
+            n_probe = min(2 * n_probe, self.n_lists)
+
+        keep = max(self.rerank, top_k)
+        if self.pq_codes is not None and len(rows) > keep:
+            approx = self._pq_scores(vector, rows)
+            rows = rows[np.argpartition(approx, -keep)[-keep:]]
+        return rows
+
+    def _pq_scores(self, vector, rows):
+        sub_dim = self.pq_codebooks.shape[2]
+        query = vector.reshape(self.pq_subspaces, 1, sub_dim)
+        # (pq_subspaces, 256) inner products of each query slice with each code
+        table = np.sum(self.pq_codebooks * query, axis=2)
+        codes = self.pq_codes[rows]
+        return table[np.arange(self.pq_subspaces), codes].sum(axis=1)
+
+    def save(self, path, source=None):
+        """source: store_signature() of the store the matrix was read from."""
+        source = source or (-1, -1)
+        arrays = {
+            'centroids': self.centroids,
+            'list_rows': self.list_rows,
+            'list_offsets': self.list_offsets,
+            'params': np.array([self.n_lists, self.n_probe, self.pq_subspaces, self.rerank]),
+            'built_from': np.array([self.n_rows, source[0], source[1]], dtype=np.int64),
+        }
+        if self.pq_codes is not None:
+            arrays['pq_codebooks'] = self.pq_codebooks
+            arrays['pq_codes'] = self.pq_codes
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        n_lists, n_probe, pq_subspaces, rerank = (int(x) for x in data['params'])
+        index = cls(n_lists, n_probe, pq_subspaces, rerank)
+        index.centroids = data['centroids']
+        index.list_rows = data['list_rows']
+        index.list_offsets = data['list_offsets']
+        if 'built_from' in data:
+            n_rows, size, mtime_ns = (int(x) for x in data['built_from'])
+            index.n_rows = n_rows
+            index.source = (size, mtime_ns) if size >= 0 else None
+        if 'pq_codes' in data:
+            index.pq_codebooks = data['pq_codebooks']
+            index.pq_codes = data['pq_codes']
+        return index
+
+    def stale_reason(self, matrix, source):
+        """
+        Returns None if the index was built over this matrix, else why not.
+        source: store_signature() of the store the matrix is served from, or None.
+        """
+        if self.n_rows is None:
+            return "it predates row-count checks"
+        if self.n_rows != len(matrix):
+            return f"it covers {self.n_rows} rows, the matrix has {len(matrix)}"
+        if self.source is not None and source is not None and tuple(self.source) != tuple(source):
+            return "the embedding store changed since it was built"
+        return None
+
+
+def get_index_path(language='en'):
+    from game_logic.vector_db import VectorDB
+    return VectorDB().get_store_path(language) + ".ivf.npz"
+
+def evaluate(language='en', top_k=10, n_queries=200, seed=0):
+    """
+    Reports recall@k and query latency of the ANN index against the exact scan.
+    Returns None if the language has no words or no usable index.
+    """
+    from game_logic.vector_db import VectorDB
+
+    db = VectorDB()
+    db.use_ann(language, False)
+    words = db.get_word_list(language)
+    if not words:
+        return None
+
+    rng = np.random.default_rng(seed)
+    queries = [db.get_word_vector(words[i], language)
+               for i in rng.choice(len(words), min(n_queries, len(words)), replace=False)]
+
+    def run():
+        results, times = [], []
+        for q in queries:
+            start = time.perf_counter()
+            found, _ = db.search(q, language, top_k=top_k)
+            times.append((time.perf_counter() - start) * 1000)
+            results.append(set(found))
+        return results, np.array(times)
+
+    exact, exact_ms = run()
+    # use_ann says why when the index is missing or stale
+    if not db.use_ann(language):
+        return None
+    approx, approx_ms = run()
+    db.use_ann(language, False)
+
+    recall = np.mean([len(a & e) / max(len(e), 1) for a, e in zip(approx, exact)])
+    report = {
+        'language': language,
+        'rows': len(words),
+        'top_k': top_k,
+        'recall': float(recall),
+        'exact_ms_p50': float(np.percentile(exact_ms, 50)),
+        'exact_ms_p95': float(np.percentile(exact_ms, 95)),
+        'ann_ms_p50': float(np.percentile(approx_ms, 50)),
+        'ann_ms_p95': float(np.percentile(approx_ms, 95)),
+    }
+    print(f"[{language}] {len(words)} rows, recall@{top_k}: {recall:.3f}")
+    print(f"  exact scan: p50 {report['exact_ms_p50']:.2f} ms, p95 {report['exact_ms_p95']:.2f} ms")
+    print(f"  ann index:  p50 {report['ann_ms_p50']:.2f} ms, p95 {report['ann_ms_p95']:.2f} ms")
+    return report
+
+def main():
+    import argparse
+    from game_logic import embedding_store
+    from game_logic.vector_db import VectorDB
+
+    parser = argparse.ArgumentParser(description="Build or evaluate the VectorDB ANN index.")
+    parser.add_argument("command", choices=["build", "eval"])
+    parser.add_argument("languages", nargs="*", default=["en"])
+    parser.add_argument("--lists", type=int, default=None, help="number of k-means lists (default: 4*sqrt(rows))")
+    parser.add_argument("--probe", type=int, default=8)
+    parser.add_argument("--pq", type=int, default=0, help="PQ subspaces, 0 to disable")
+    parser.add_argument("--rerank", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for language in args.languages:
+        if args.command == "build":
+            db = VectorDB()
+            matrix = db.get_matrix(language)
+            if matrix is None:
+                continue
+            n_lists = args.lists or max(1, int(4 * np.sqrt(len(matrix))))
+            print(f"Building IVF index for {language}: {len(matrix)} rows, {n_lists} lists...")
+            start = time.perf_counter()
+            index = IVFIndex(n_lists, args.probe, args.pq, args.rerank).build(matrix)
+            index.save(get_index_path(language), embedding_store.store_signature(db.get_store_path(language)))
+            print(f"Saved {get_index_path(language)} in {time.perf_counter() - start:.1f} s")
+        elif evaluate(language, top_k=args.top_k) is None:
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
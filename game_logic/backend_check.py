@@ -0,0 +1,51 @@
+import sys
+import os
+import json
+import argparse
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic.services import WordSimilarityService
+
+# Checks a CPU inference backend against the reference models before using it:
+#
+#   python game_logic/backend_check.py en fr --quantize --threads 2 --max-seq-length 16
+#
+# Exits with status 1 if a language's similarities drift past the tolerance.
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a CPU inference backend with the reference models.")
+    parser.add_argument("languages", nargs="*", default=["en", "fr", "ar"])
+    parser.add_argument("--quantize", action="store_true", help="dynamic int8 quantization of Linear layers")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--max-seq-length", type=int, default=None, help="token limit per word")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="allowed change of any similarity")
+    parser.add_argument("--words", type=int, default=200, help="vocabulary words sampled per language")
+    parser.add_argument("--output", default=None, help="write the reports as JSON")
+    args = parser.parse_args()
+
+    service = WordSimilarityService()
+    service.configure_backend(args.quantize, args.threads, args.max_seq_length)
+
+    reports = []
+    checked = set()
+    for language in args.languages:
+        # fr and ar share a model
+        if service.get_model_name(language) in checked:
+            continue
+        checked.add(service.get_model_name(language))
+        report = service.check_backend(language, tolerance=args.tolerance, n_words=args.words)
+        if report is not None:
+            reports.append(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if not reports or not all(r['ok'] for r in reports):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import sys
+import os
+import argparse
+import threading
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:   # Windows: appends are only safe within one process
+    fcntl = None
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic.keyed_lock import KeyedLock
+
+# Persistent embedding cache for words the VectorDB store does not have, so a
+# word costs one model encode across every run and worker process.
+# One cache per (language, model), in word_list/cache/<language>/<model>:
+#   .vec        16-byte header ("CMXE" + dim) then float32 rows, append-only
+#   .words.txt  the words, one per line, in row order
+#   .lock       flock'ed by writers
+# A row is appended before its word, so a reader that sees a word also sees
+# its vector; readers memory-map the rows and never lock. Only words encoded
+# with the reference backend are added (see WordSimilarityService.configure_backend).
+#
+#   python game_logic/disk_cache.py stats en fr
+#   python game_logic/disk_cache.py compact en
+#
+# compact folds cached words into the language's store and empties the cache.
+# Processes that already loaded the store only see the new rows after a
+# restart (or VectorDB().unload), so compact while the workers are stopped.
+# Files built from the old store (ANN index, precomputed tables, quantized
+# copies) are listed for rebuilding; the first two are ignored until then.
+
+MAGIC = b"CMXE"
+HEADER_BYTES = 16
+
+def get_cache_root():
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "word_list", "cache")
+
+def _header(dim):
+    return MAGIC + np.array([dim], dtype='<u4').tobytes() + bytes(HEADER_BYTES - 8)
+
+
+class DiskEmbeddingCache:
+    def __init__(self, language, model_name, root=None):
+        self.language = language
+        self.model_name = model_name
+        folder = os.path.join(root or get_cache_root(), language)
+        self.base_path = os.path.join(folder, model_name.replace("/", "__"))
+        self.vec_path = self.base_path + ".vec"
+        self.words_path = self.base_path + ".words.txt"
+        self.lock_path = self.base_path + ".lock"
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._words = []
+        self._index = {}
+        self._offset = 0      # bytes of the words file already read
+        self._inode = None    # compaction swaps the files in, which changes it
+        self._vectors = None
+        self.dim = None
+
+    # ─── Reading ─────────────────────────────────────────────────────────────
+
+    def _refresh(self):
+        """Picks up words appended (or a compaction done) by any process since the last call."""
+        try:
+            stat = os.stat(self.words_path)
+        except OSError:
+            self._reset()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._reset()
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+
+        try:
+            with open(self.words_path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read(stat.st_size - self._offset)
+            # Only whole lines; a word being written is picked up next time
+            data = data[:data.rfind(b"\n") + 1]
+            new_words = data.decode('utf-8').split("\n")[:-1]
+            if not new_words:
+                return
+
+            with open(self.vec_path, 'rb') as f:
+                header = f.read(HEADER_BYTES)
+            if header[:4] != MAGIC:
+                raise ValueError(f"bad header in {self.vec_path}")
+            dim = int(np.frombuffer(header[4:8], dtype='<u4')[0])
+
+            n_rows = len(self._words) + len(new_words)
+            vectors = np.memmap(self.vec_path, dtype='<f4', mode='r', offset=HEADER_BYTES, shape=(n_rows, dim))
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            print(f"Disk cache read error ({self.base_path}): {e}")
+            return
+
+        for word in new_words:
+            self._index.setdefault(word, len(self._words))
+            self._words.append(word)
+        self._offset += len(data)
+        self._vectors = vectors
+        self.dim = dim
+
+    def lookup(self, words):
+        """Returns {word: vector} for the words that are cached."""
+        with self._lock:
+            if any(w not in self._index for w in words):
+                self._refresh()
+            return {w: np.array(self._vectors[self._index[w]]) for w in words if w in self._index}
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._words)
+
+    # ─── Writing ─────────────────────────────────────────────────────────────
+
+    def _locked(self):
+        return _FileLock(self.lock_path)
+
+    def append(self, words, vectors):
+        """Adds words not cached yet; safe against concurrent appends from other processes."""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.base_path), exist_ok=True)
+                with self._locked():
+                    self._append(words, vectors)
+            except OSError as e:
+                print(f"Disk cache write error ({self.base_path}): {e}")
+
+    def _append(self, words, vectors):
+        self._refresh()
+        fresh = {}
+        for word, vector in zip(words, vectors):
+            if vector is not None and word not in self._index and "\n" not in word:
+                fresh[word] = np.asarray(vector, dtype='<f4')
+        if not fresh:
+            return
+
+        dim = len(next(iter(fresh.values())))
+        if self.dim is not None and dim != self.dim:
+            print(f"Disk cache error ({self.base_path}): {dim}-d vectors for a {self.dim}-d cache")
+            return
+
+        mode = 'r+b' if os.path.exists(self.vec_path) and os.path.exists(self.words_path) else 'w+b'
+        if mode == 'w+b':
+            open(self.words_path, 'wb').close()
+            self._reset()
+        else:
+            self._drop_partial_line()
+        with open(self.vec_path, mode) as f:
+            size = f.seek(0, os.SEEK_END)
+            expected = HEADER_BYTES + len(self._words) * dim * 4
+            if size < HEADER_BYTES:
+                f.seek(0)
+                f.write(_header(dim))
+            elif size > expected:
+                # Left over from a writer that died before appending the words
+                f.truncate(expected)
+            f.seek(expected)
+            f.write(np.stack(list(fresh.values())).tobytes())
+            f.flush()
+        with open(self.words_path, 'a', encoding='utf-8') as f:
+            f.write("".join(word + "\n" for word in fresh))
+        self._refresh()
+
+    def _drop_partial_line(self):
+        """Truncates a word left half-written by a writer that died, so the next one starts its own line."""
+        with open(self.words_path, 'r+b') as f:
+            f.seek(self._offset)
+            tail = f.read()
+            complete = tail.rfind(b"\n") + 1
+            if complete < len(tail):
+                f.truncate(self._offset + complete)
+
+    # ─── Compaction ──────────────────────────────────────────────────────────
+
+    def compact(self):
+        """
+        Appends the cached words missing from the language's VectorDB store to
+        that store and empties the cache. Returns the number of words added.
+        """
+        from game_logic import embedding_store
+        from game_logic.embedding_store import QuantizedMatrix
+        from game_logic.vector_db import VectorDB
+
+        db = VectorDB()
+        store_path = db.get_store_path(self.language)
+        with self._lock, self._locked():
+            self._refresh()
+            if not self._words:
+                return 0
+
+            if embedding_store.store_exists(store_path):
+                store_words, matrix = embedding_store.read_store(store_path)
+            else:
+                store_words, matrix = [], np.empty((0, self.dim), dtype=np.float32)
+            if matrix.shape[1] != self.dim:
+                print(f"Cannot compact {self.base_path}: store is {matrix.shape[1]}-d, cache is {self.dim}-d")
+                return 0
+
+            known = set(store_words)
+            rows = [i for i, word in enumerate(self._words) if word not in known]
+            if rows:
+                dtype = matrix.storage_dtype if isinstance(matrix, QuantizedMatrix) else "float32"
+                new_vectors = embedding_store.normalize_rows(np.asarray(self._vectors[rows], dtype=np.float32))
+                embedding_store.write_store(
+                    store_path,
+                    list(store_words) + [self._words[i] for i in rows],
+                    np.vstack([np.asarray(matrix, dtype=np.float32), new_vectors]),
+                    dtype=dtype,
+                )
+
+            # Swap in empty files rather than truncating: readers may still map the old rows
+            for path, content in ((self.vec_path, _header(self.dim)), (self.words_path, b"")):
+                with open(path + ".tmp", 'wb') as f:
+                    f.write(content)
+                os.replace(path + ".tmp", path)
+            self._reset()
+
+        db.unload(self.language)
+        if rows:
+            stale = self._derived_files(store_path)
+            if stale:
+                print(f"{store_path} changed; rebuild the files derived from it:")
+                for path in stale:
+                    print(f"  {path}")
+        return len(rows)
+
+    def _derived_files(self, store_path):
+        from game_logic import embedding_store
+        from game_logic.ann_index import get_index_path
+        from game_logic.precompute import get_precompute_dir
+        from game_logic.quantize import get_quantized_path
+
+        paths = []
+        if os.path.exists(get_index_path(self.language)):
+            paths.append(get_index_path(self.language))
+        precomputed = os.path.dirname(get_precompute_dir(self.language, "mixed"))
+        if os.path.isdir(precomputed):
+            paths.extend(os.path.join(precomputed, pack) for pack in sorted(os.listdir(precomputed)))
+        for dtype in embedding_store.QUANTIZED_DTYPES:
+            base_path = get_quantized_path(self.language, dtype)
+            if base_path != store_path and embedding_store.store_exists(base_path):
+                paths.append(base_path + ".npy")
+        return paths
+
+
+class _FileLock:
+    """Exclusive flock on a lock file, shared by every process using the cache."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+
+
+_caches = {}   # (language, model name) -> DiskEmbeddingCache
+_open_locks = KeyedLock()
+
+def get_disk_cache(language, model_name):
+    key = (language, model_name)
+    cache = _caches.get(key)
+    if cache is None:
+        with _open_locks(key):
+            cache = _caches.get(key)
+            if cache is None:
+                cache = _caches[key] = DiskEmbeddingCache(language, model_name)
+    return cache
+
+def main():
+    from game_logic.services import WordSimilarityService
+    from game_logic.vector_db import VectorDB
+
+    parser = argparse.ArgumentParser(description="Inspect or compact the persistent embedding cache.")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("languages", nargs="*", default=["en", "fr", "ar"])
+    args = parser.parse_args()
+
+    service = WordSimilarityService()
+    for language in args.languages:
+        cache = get_disk_cache(language, service.get_model_name(language))
+        if args.command == "stats":
+            print(f"[{language}] {len(cache)} cached words in {cache.base_path}")
+        else:
+            added = cache.compact()
+            print(f"[{language}] added {added} words to {VectorDB().get_store_path(language)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import sys
+import os
+import shutil
+import argparse
+import multiprocessing
+import numpy as np
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import embedding_store
+from game_logic.services import WordSimilarityService
+
+# Embeds a vocabulary or pack file with the model WordSimilarityService uses for
+# the language and writes the binary store VectorDB loads (embedding_store.py).
+#
+# Words are encoded in batches and saved in chunks under <output>.chunks/, so an
+# interrupted run only redoes the chunk it was working on. Chunks can be spread
+# over several worker processes, each with its own copy of the model.
+
+def read_words(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(dict.fromkeys(line.strip().lower() for line in f if line.strip()))
+
+def get_chunk_path(chunk_dir, i):
+    return os.path.join(chunk_dir, f"chunk_{i:05d}.npy")
+
+def encode_words(words, language, batch_size):
+    model = WordSimilarityService().load_model(language)
+    if model is None:
+        raise RuntimeError(f"Could not load the {language} model")
+    embeddings = model.encode(words, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    return embedding_store.normalize_rows(np.asarray(embeddings, dtype=np.float32))
+
+def _embed_chunk(task):
+    i, words, language, batch_size, chunk_dir = task
+    path = get_chunk_path(chunk_dir, i)
+    vectors = encode_words(words, language, batch_size)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, vectors)
+    os.replace(tmp_path, path)
+    return i
+
+def _prepare_chunk_dir(chunk_dir, words):
+    """Reuses finished chunks only if they were made for the same word list."""
+    manifest = os.path.join(chunk_dir, "words.txt")
+    if os.path.exists(manifest):
+        with open(manifest, 'r', encoding='utf-8') as f:
+            if [line.rstrip("\n") for line in f] == words:
+                return
+        print("Word list changed since the last run, starting over.")
+        shutil.rmtree(chunk_dir)
+
+    os.makedirs(chunk_dir, exist_ok=True)
+    with open(manifest, 'w', encoding='utf-8') as f:
+        for word in words:
+            f.write(word + "\n")
+
+def build(language, words_path, output=None, batch_size=512, chunk_size=20000, workers=1, keep_chunks=False):
+    words = read_words(words_path)
+    if not words:
+        print(f"No words found in {words_path}")
+        return None
+
+    output = output or os.path.splitext(words_path)[0]
+    chunk_dir = output + ".chunks"
+    _prepare_chunk_dir(chunk_dir, words)
+
+    n_chunks = (len(words) + chunk_size - 1) // chunk_size
+    tasks = [(i, words[i * chunk_size:(i + 1) * chunk_size], language, batch_size, chunk_dir)
+             for i in range(n_chunks) if not os.path.exists(get_chunk_path(chunk_dir, i))]
+
+    model_name = WordSimilarityService().get_model_name(language)
+    print(f"Embedding {len(words)} words with {model_name}: "
+          f"{n_chunks - len(tasks)}/{n_chunks} chunks already done.")
+
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for i in pool.imap_unordered(_embed_chunk, tasks):
+                print(f"  chunk {i + 1}/{n_chunks} done")
+    else:
+        for task in tasks:
+            _embed_chunk(task)
+            print(f"  chunk {task[0] + 1}/{n_chunks} done")
+
+    chunks = (np.load(get_chunk_path(chunk_dir, i), mmap_mode='r') for i in range(n_chunks))
+    dim = np.load(get_chunk_path(chunk_dir, 0), mmap_mode='r').shape[1]
+    embedding_store.write_store_chunks(output, words, chunks, dim)
+    print(f"Wrote {len(words)} vectors to {output}.npy")
+
+    if not keep_chunks:
+        shutil.rmtree(chunk_dir)
+    return output
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed a vocabulary or pack file into a VectorDB store.")
+    parser.add_argument("language", choices=["en", "fr", "ar"])
+    parser.add_argument("words", help="word file, one word per line (e.g. word_list/vocabulary/words_alpha.txt)")
+    parser.add_argument("--output", default=None, help="store base path (default: next to the word file)")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--chunk-size", type=int, default=20000, help="words per checkpoint file")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--keep-chunks", action="store_true")
+    args = parser.parse_args()
+
+    build(args.language, args.words, args.output, args.batch_size, args.chunk_size, args.workers, args.keep_chunks)
+
+if __name__ == "__main__":
+    main()
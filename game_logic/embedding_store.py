@@ -0,0 +1,272 @@
+import sys
+import os
+import csv
+import numpy as np
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Binary embedding store:
+#   <name>.npy        normalized float32 matrix, one row per word
+#   <name>.words.txt  the words, one per line, in row order
+# The .npy file is opened with mmap_mode='r' so loading is near instant
+# and processes reading the same store share its pages through the OS cache.
+#
+# A store can also be quantized to save memory (see game_logic/quantize.py):
+#   float16  <name>.npy holds float16 rows                       (1/2 the size)
+#   int8     <name>.npy holds int8 rows and <name>.scales.npy    (~1/4 the size)
+#            one float32 scale per row, row = int8 row * scale
+# Quantized stores are read back as a QuantizedMatrix.
+
+QUANTIZED_DTYPES = ("float16", "int8")
+
+def get_store_paths(base_path):
+    """base_path is the store path without extension, e.g. word_list/packs/mixed"""
+    return base_path + ".npy", base_path + ".words.txt"
+
+def get_scales_path(base_path):
+    return base_path + ".scales.npy"
+
+def store_exists(base_path):
+    matrix_path, words_path = get_store_paths(base_path)
+    return os.path.exists(matrix_path) and os.path.exists(words_path)
+
+def store_is_current(base_path, source_path):
+    """True if the store exists and is not older than the file it was built from."""
+    if not store_exists(base_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    matrix_path, _ = get_store_paths(base_path)
+    return os.path.getmtime(matrix_path) >= os.path.getmtime(source_path)
+
+def store_signature(base_path):
+    """(size, mtime in ns) of the store's matrix file, recorded by the files derived from it; None if missing."""
+    matrix_path, _ = get_store_paths(base_path)
+    try:
+        stat = os.stat(matrix_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def quantize(matrix, dtype, block_size=65536):
+    """
+    Returns (data, scales) for a float matrix: float16 rows and no scales, or
+    int8 rows with one float32 scale per row (max |value| maps to 127).
+    """
+    if dtype not in QUANTIZED_DTYPES:
+        raise ValueError(f"Unknown quantized dtype {dtype}, expected one of {QUANTIZED_DTYPES}")
+    n_rows = len(matrix)
+    data = np.empty(matrix.shape, dtype=np.float16 if dtype == "float16" else np.int8)
+    scales = np.empty(n_rows, dtype=np.float32) if dtype == "int8" else None
+
+    for start in range(0, n_rows, block_size):
+        block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+        if scales is None:
+            data[start:start + block_size] = block
+            continue
+        block_scales = np.abs(block).max(axis=1) / 127.0
+        block_scales[block_scales == 0] = 1.0
+        data[start:start + block_size] = np.rint(block / block_scales[:, None])
+        scales[start:start + block_size] = block_scales
+    return data, scales
+
+def write_store(base_path, words, matrix, dtype="float32"):
+    """
+    Writes a store atomically so readers never see a half written file.
+    dtype "float16" or "int8" writes a quantized store.
+    """
+    matrix_path, words_path = get_store_paths(base_path)
+    scales_path = get_scales_path(base_path)
+    if len(words) != len(matrix):
+        raise ValueError(f"Store has {len(words)} words but {len(matrix)} vectors")
+
+    scales = None
+    if dtype == "float32":
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    else:
+        matrix, scales = quantize(matrix, dtype)
+
+    tmp_matrix = matrix_path + ".tmp"
+    tmp_words = words_path + ".tmp"
+    tmp_scales = scales_path + ".tmp"
+    with open(tmp_matrix, 'wb') as f:
+        np.save(f, matrix)
+    with open(tmp_words, 'w', encoding='utf-8') as f:
+        for word in words:
+            f.write(word + "\n")
+    if scales is not None:
+        with open(tmp_scales, 'wb') as f:
+            np.save(f, scales)
+        os.replace(tmp_scales, scales_path)
+    elif os.path.exists(scales_path):
+        os.remove(scales_path)
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_words, words_path)
+
+def write_store_chunks(base_path, words, chunks, dim):
+    """
+    Like write_store, but streams already normalized (rows, dim) chunks into the
+    matrix file so the whole vocabulary never has to sit in memory twice.
+    """
+    matrix_path, words_path = get_store_paths(base_path)
+    tmp_matrix = matrix_path + ".tmp"
+    tmp_words = words_path + ".tmp"
+
+    matrix = np.lib.format.open_memmap(tmp_matrix, mode='w+', dtype=np.float32, shape=(len(words), dim))
+    row = 0
+    for chunk in chunks:
+        matrix[row:row + len(chunk)] = chunk
+        row += len(chunk)
+    if row != len(words):
+        raise ValueError(f"Store has {len(words)} words but {row} vectors")
+    matrix.flush()
+    del matrix
+
+    with open(tmp_words, 'w', encoding='utf-8') as f:
+        for word in words:
+            f.write(word + "\n")
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_words, words_path)
+
+def read_store(base_path, mmap=True):
+    """
+    Returns (words, matrix). The matrix is a read-only memory map by default,
+    wrapped in a QuantizedMatrix for float16 and int8 stores.
+    """
+    matrix_path, words_path = get_store_paths(base_path)
+    matrix = np.load(matrix_path, mmap_mode='r' if mmap else None)
+    with open(words_path, 'r', encoding='utf-8') as f:
+        words = [line.rstrip("\n") for line in f]
+    if len(words) != len(matrix):
+        raise ValueError(f"Corrupt store {base_path}: {len(words)} words for {len(matrix)} vectors")
+
+    if matrix.dtype == np.int8:
+        scales = np.load(get_scales_path(base_path), mmap_mode='r' if mmap else None)
+        if len(scales) != len(matrix):
+            raise ValueError(f"Corrupt store {base_path}: {len(scales)} scales for {len(matrix)} vectors")
+        matrix = QuantizedMatrix(matrix, scales)
+    elif matrix.dtype == np.float16:
+        matrix = QuantizedMatrix(matrix)
+    return words, matrix
+
+
+class QuantizedMatrix:
+    """
+    Read-only stand-in for a float32 (n_words, dim) matrix stored as float16,
+    or as int8 with per-row scales. Supports what VectorDB and the bots use:
+    len, shape, row indexing (rows come back dequantized as float32) and
+    `matrix @ x`, computed a block of rows at a time so the full float32
+    matrix never exists in memory.
+    """
+    block_size = 8192
+    ndim = 2
+
+    def __init__(self, data, scales=None):
+        self.data = data
+        self.scales = scales
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    @property
+    def storage_dtype(self):
+        return "int8" if self.scales is not None else "float16"
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows = self[key[0]]
+            return rows[key[1:]] if rows.ndim == 1 else rows[(slice(None),) + key[1:]]
+
+        rows = self.data[key].astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales[key]
+            rows *= scales[:, None] if rows.ndim == 2 else scales
+        return rows
+
+    def __matmul__(self, other):
+        other = np.asarray(other, dtype=np.float32)
+        out = np.empty((len(self),) + other.shape[1:], dtype=np.float32)
+        for start in range(0, len(self), self.block_size):
+            stop = start + self.block_size
+            # Scales factor out of the dot product: (q @ x) * scale
+            block = self.data[start:stop].astype(np.float32) @ other
+            if self.scales is not None:
+                block *= self.scales[start:stop, None] if block.ndim == 2 else self.scales[start:stop]
+            out[start:stop] = block
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        """Full dequantized copy; avoid for large vocabularies."""
+        matrix = self[:]
+        return matrix if dtype is None else matrix.astype(dtype, copy=False)
+
+    def setflags(self, write=None):
+        pass   # always read-only
+
+def read_csv(csv_path):
+    """Parses a word,v1,v2,... CSV into (words, normalized float32 matrix)."""
+    words = []
+    rows = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if len(row) < 2:
+                continue
+            try:
+                vec = np.array(row[1:], dtype=np.float32)
+            except ValueError:
+                continue
+            if rows and len(vec) != len(rows[0]):
+                continue
+            words.append(row[0].strip().lower())
+            rows.append(vec)
+
+    if not rows:
+        return [], np.empty((0, 0), dtype=np.float32)
+    return words, normalize_rows(np.vstack(rows))
+
+def convert_csv(csv_path):
+    """One-time conversion of an embedding CSV into a binary store next to it."""
+    base_path = os.path.splitext(csv_path)[0]
+    words, matrix = read_csv(csv_path)
+    write_store(base_path, words, matrix)
+    return base_path, len(words)
+
+def main():
+    from game_logic.vector_db import VectorDB
+
+    targets = sys.argv[1:] or ['en', 'fr', 'ar']
+    for target in targets:
+        if target.endswith(".csv"):
+            csv_path = target
+        else:
+            csv_path = os.path.join(VectorDB().get_pack_dir(target), "mixed.csv")
+
+        if not os.path.exists(csv_path):
+            print(f"Skipping {target}: {csv_path} not found")
+            continue
+
+        print(f"Converting {csv_path}...")
+        base_path, count = convert_csv(csv_path)
+        print(f"Wrote {count} vectors to {base_path}.npy")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class EncodeScheduler:
+    """
+    Collects words submitted from many threads or coroutines and encodes them
+    together. A batch is sent to encode_fn once max_batch words are pending or
+    max_wait seconds have passed since the first one, and each caller gets its
+    row back through a future.
+
+    encode_fn: takes a list of words, returns one vector per word
+    """
+
+    def __init__(self, encode_fn, max_batch=64, max_wait=0.003):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.words_encoded = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        # Held while queueing, so nothing can be queued behind close()'s sentinel
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, word):
+        """Queues a word and returns a concurrent.futures.Future of its vector."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EncodeScheduler is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="encode-scheduler", daemon=True)
+                self._thread.start()
+            self._queue.put((word, future))
+        return future
+
+    def encode(self, words):
+        """Blocking, thread-safe: returns the vectors of words, in order."""
+        futures = [self.submit(word) for word in words]
+        return [f.result() for f in futures]
+
+    async def encode_async(self, word):
+        """asyncio interface: awaits the vector of one word without blocking the loop."""
+        return await asyncio.wrap_future(self.submit(word))
+
+    def close(self):
+        """Encodes the words already submitted, then stops the thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            # The same word may be pending for several games; encode it once
+            words = list(dict.fromkeys(word for word, _ in batch))
+            try:
+                vectors = dict(zip(words, self.encode_fn(words)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.words_encoded += len(words)
+            for word, future in batch:
+                future.set_result(vectors[word])
@@ -1,6 +1,34 @@
 import random
 import os
+import importlib
+import numpy as np
 from game_logic.services import WordSimilarityService
+from game_logic.vector_db import VectorDB
+from game_logic.precompute import PrecomputeStore
+from game_logic.word_registry import WordRegistry
+from game_logic.metrics import Metrics
+
+# Like Cemantix, only the words closest to the goal get a rank
+RANKED_WORDS = 1000
+
+# (upper rank bound, bucket) for ranked words, closest first
+RANK_TEMPERATURES = [(10, "burning"), (100, "hot"), (RANKED_WORDS, "warm")]
+# (lower similarity bound, bucket) for unranked words
+SIMILARITY_TEMPERATURES = [(0.2, "tepid"), (0.0, "cold")]
+
+# difficulty -> (module, class); bot modules are imported on first use
+BOT_CLASSES = {
+    "noob": ("bots.Noob", "NoobBot"),
+    "pro": ("bots.Pro", "ProBot"),
+    "hacker": ("bots.Hacker", "HackerBot"),
+}
+_loaded_bot_classes = {}
+
+def get_bot_class(difficulty):
+    if difficulty not in _loaded_bot_classes:
+        module_name, class_name = BOT_CLASSES[difficulty]
+        _loaded_bot_classes[difficulty] = getattr(importlib.import_module(module_name), class_name)
+    return _loaded_bot_classes[difficulty]
 
 class Player:
     def __init__(self, name):
@@ -11,10 +39,35 @@ class Player:
         self.is_bot = False
         self.difficulty = None
         self.bot_agent = None
+        # Embeddings of earlier valid guesses, stacked as rows of one matrix
+        self._guess_matrix = None
+        self._guess_count = 0
+
+    @property
+    def guess_matrix(self):
+        if self._guess_matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._guess_matrix[:self._guess_count]
+
+    def add_guess_vector(self, vector):
+        """Appends a row to the guess matrix, doubling its capacity when full."""
+        if self._guess_matrix is None:
+            self._guess_matrix = np.zeros((16, len(vector)), dtype=np.float32)
+        elif self._guess_count == len(self._guess_matrix):
+            grown = np.zeros((2 * len(self._guess_matrix), self._guess_matrix.shape[1]), dtype=np.float32)
+            grown[:self._guess_count] = self._guess_matrix
+            self._guess_matrix = grown
+        self._guess_matrix[self._guess_count] = vector
+        self._guess_count += 1
 
 class GameSession:
-    def __init__(self, language='en', category=None, goal_word=None):
+    def __init__(self, language='en', category=None, goal_word=None, preload_model=True):
+        """
+        preload_model=False starts the game from VectorDB's precomputed embeddings
+        only; the model is loaded lazily the first time a word has no embedding.
+        """
         self.similarity_service = WordSimilarityService()
+        self.vector_db = VectorDB()
         self.language = language
         self.category = category
         
@@ -37,68 +90,127 @@ class GameSession:
         }
         
         lang_config = self.paths.get(language, self.paths['en'])
-        self.vocabulary = self._load_word_set(lang_config['vocab'])
+        # Shared, immutable word collections; no per-session copies
+        registry = WordRegistry()
+        self.vocabulary = registry.get_word_set(lang_config['vocab'])
         
         category_name = f"{category}.txt" if category else "mixed.txt"
         pack_path = os.path.join(lang_config['packs'], category_name)
         
-        self.target_pool = self._load_word_list(pack_path)
+        self.target_pool = registry.get_word_list(pack_path)
         if not self.target_pool:
             fallback_path = os.path.join(lang_config['packs'], "mixed.txt")
-            self.target_pool = self._load_word_list(fallback_path)
+            self.target_pool = registry.get_word_list(fallback_path)
         
-        print(f"Loading model for {language}...")
-        self.similarity_service.load_model(language)
+        if preload_model:
+            print(f"Loading model for {language}...")
+            self.similarity_service.load_model(language)
         
         self.goal_word = goal_word if goal_word else random.choice(self.target_pool)
+        self._build_goal_table()
         self.players = []
         self.global_best_similarity = 0.0
         self.winner = None
 
-    def _load_word_list(self, filepath):
-        if not os.path.exists(filepath):
-            print(f"Warning: File not found: {filepath}")
-            return []
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return [line.strip().lower() for line in f if line.strip()]
-        except Exception as e:
-            print(f"Error loading {filepath}: {e}")
-            return []
+    def _build_goal_table(self):
+        """
+        Scores the goal word against every embedded word once, so guesses
+        become array lookups. goal_ranks maps a row to its rank (1 = closest
+        word other than the goal) for the RANKED_WORDS closest rows.
+        """
+        self.goal_similarities = None
+        self.goal_ranks = {}
+
+        matrix = self.vector_db.get_matrix(self.language)
+        if matrix is None or len(matrix) == 0:
+            return
+
+        # Scheduled goals may already have their row on disk (game_logic/precompute.py)
+        precomputed = PrecomputeStore().get_goal(self.goal_word, self.language, self.category or "mixed")
+        if precomputed is not None and len(precomputed[0]) == len(matrix):
+            sims, neighbours = precomputed
+            self.goal_ranks = {int(row): rank for rank, row in enumerate(neighbours[:RANKED_WORDS], start=1)}
+            self.goal_similarities = sims
+            return
+
+        goal_vector = self.vector_db.get_word_vector(self.goal_word, self.language)
+        if goal_vector is None:
+            goal_vector = self.similarity_service.get_embedding(self.goal_word, self.language)
+        if goal_vector is None or len(goal_vector) != matrix.shape[1]:
+            return
+
+        sims = matrix @ goal_vector
+        ranked = sims.copy()
+        goal_row = self.vector_db.get_word_row(self.goal_word, self.language)
+        if goal_row is not None:
+            ranked[goal_row] = -np.inf
 
-    def _load_word_set(self, filepath):
-        return set(self._load_word_list(filepath))
+        k = min(RANKED_WORDS, len(ranked) - (1 if goal_row is not None else 0))
+        if k > 0:
+            top = np.argpartition(ranked, -k)[-k:]
+            top = top[np.argsort(ranked[top])[::-1]]
+            self.goal_ranks = {int(row): rank for rank, row in enumerate(top, start=1)}
+        self.goal_similarities = sims
+
+    def get_temperature(self, similarity, rank):
+        if rank == 0:
+            return "found"
+        if rank is not None:
+            for bound, bucket in RANK_TEMPERATURES:
+                if rank <= bound:
+                    return bucket
+        for bound, bucket in SIMILARITY_TEMPERATURES:
+            if similarity >= bound:
+                return bucket
+        return "freezing"
 
     def add_player(self, name, is_bot=False, difficulty=None):
         player = Player(name)
         player.is_bot = is_bot
         player.difficulty = difficulty
-        if is_bot:
-            from bots.Noob import NoobBot
-            from bots.Pro import ProBot
-            from bots.Hacker import HackerBot
-            
-            if difficulty == "noob":
-                player.bot_agent = NoobBot(self.language)
-            elif difficulty == "pro":
-                player.bot_agent = ProBot(self.language)
-            elif difficulty == "hacker":
-                player.bot_agent = HackerBot(self.language)
+        if is_bot and difficulty in BOT_CLASSES:
+            player.bot_agent = get_bot_class(difficulty)(self.language)
                 
         self.players.append(player)
 
+    def get_bot_guess(self, player_idx):
+        """Asks a bot player for its next word, given every guess on the board."""
+        player = self.players[player_idx]
+        all_guesses = []
+        for p in self.players:
+            all_guesses.extend(p.guesses)
+
+        if player.difficulty == "hacker":
+            scoreboard = {p.name: p.score for p in self.players}
+            return player.bot_agent.get_next_guess(all_guesses, scoreboard, self.category, player.name)
+        return player.bot_agent.get_next_guess(all_guesses, self.category)
+
     def make_guess(self, player_idx, word):
         player = self.players[player_idx]
         word = word.lower().strip()
+        metrics = Metrics()
+        phases = metrics.phases("guess", language=self.language)
         
         if word not in self.vocabulary:
+            metrics.increment("guesses_total", language=self.language, valid="false")
             return {
                 "word": word,
                 "error": "Word not found in vocabulary",
                 "is_valid": False
             }
+        phases.mark("vocabulary_check")
 
-        similarity = self.similarity_service.get_similarity_to_goal(word, self.goal_word, self.language)
+        row = self.vector_db.get_word_row(word, self.language)
+        if word == self.goal_word:
+            similarity, rank = 1.0, 0
+        elif row is not None and self.goal_similarities is not None:
+            # O(1) lookup, no model call for embedded words
+            similarity = float(self.goal_similarities[row])
+            rank = self.goal_ranks.get(row)
+        else:
+            similarity = self.similarity_service.get_similarity_to_goal(word, self.goal_word, self.language)
+            rank = None
+        phases.mark("similarity")
         
         score_gain = 0
         notes = []
@@ -116,21 +228,20 @@ class GameSession:
             self.global_best_similarity = similarity
             notes.append("BEST ON BOARD (+50)")
 
-        if similarity > 0.5:
-            is_different_angle = True
-            for prev_guess in player.guesses:
-                if prev_guess['word'] == word:
-                     is_different_angle = False
-                     break
-                     
-                sim_between = self.similarity_service.compute_similarity(word, prev_guess['word'], self.language)
-                if sim_between > 0.5:
-                    is_different_angle = False
-                    break
-            
-            if is_different_angle and len(player.guesses) > 0:
-                 score_gain += 80
-                 notes.append("DIFFERENT ANGLE (+80)")
+        if row is not None:
+            word_vector = self.vector_db.get_word_vector(word, self.language)
+        else:
+            word_vector = self.similarity_service.get_embedding(word, self.language)
+        phases.mark("guess_vector")
+
+        if similarity > 0.5 and len(player.guesses) > 0:
+            # One matrix-vector product against every earlier guess of this player
+            already_guessed = any(g['word'] == word for g in player.guesses)
+            if not already_guessed and word_vector is not None and player.guess_matrix.size:
+                sims_between = player.guess_matrix @ word_vector
+                if not np.any(sims_between > 0.5):
+                    score_gain += 80
+                    notes.append("DIFFERENT ANGLE (+80)")
 
         player.score += score_gain
         if similarity > player.best_similarity:
@@ -139,10 +250,18 @@ class GameSession:
         guess_result = {
             "word": word,
             "similarity": similarity,
+            "rank": rank,
+            "temperature": self.get_temperature(similarity, rank),
             "score_gain": score_gain,
             "total_score": player.score,
             "notes": ", ".join(notes),
             "is_valid": True
         }
         player.guesses.append(guess_result)
+        if word_vector is not None:
+            player.add_guess_vector(word_vector)
+        phases.mark("bonuses")
+
+        metrics.increment("guesses_total", language=self.language, valid="true")
+        phases.finish(word=word, embedded=row is not None)
         return guess_result
@@ -0,0 +1,27 @@
+import threading
+
+class KeyedLock:
+    """
+    One lock per key (a language, a model name, a file...), created on first use.
+    Used for load-once caches: check the cache without locking, and only on a
+    miss take the key's lock and check again, so concurrent callers wait for
+    the one load in flight instead of repeating it:
+
+        value = cache.get(key)
+        if value is None:
+            with load_locks(key):
+                value = cache.get(key)
+                if value is None:
+                    value = cache[key] = load(key)
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, key):
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.Lock())
+        return lock
@@ -19,6 +19,10 @@ def input_with_timeout(prompt, timeout):
         return None
 
 def main():
+    # --fast: serve the game from precomputed embeddings, only loading the
+    # model if a guess has no embedding
+    fast_start = "--fast" in sys.argv[1:]
+
     print("Welcome to Cemantix Multiplayer!")
     
     # Language Selection
@@ -42,7 +46,7 @@ def main():
     category = cat_map.get(cat_choice, None)
     
     print(f"\nInitializing Game in {language} (Category: {category if category else 'Mixed'})...")
-    game = GameSession(language=language, category=category)
+    game = GameSession(language=language, category=category, preload_model=not fast_start)
     print(f"Goal Word Selected: {game.goal_word} (Hidden)")
     
     # Player Setup
@@ -89,15 +93,7 @@ def main():
             print(f"{current_player.name} is thinking...")
             time.sleep(1) 
             
-            all_guesses = []
-            for p in game.players:
-                all_guesses.extend(p.guesses)
-            
-            if current_player.difficulty == "hacker":
-                scoreboard = {p.name: p.score for p in game.players}
-                guess = current_player.bot_agent.get_next_guess(all_guesses, scoreboard, category, current_player.name)
-            else:
-                guess = current_player.bot_agent.get_next_guess(all_guesses)
+            guess = game.get_bot_guess(current_player_idx)
                 
             print(f"Bot Guessed: {guess}")
             
@@ -122,6 +118,8 @@ def main():
 
             print(f"Word: {result['word']}")
             print(f"Similarity: {result['similarity']:.4f}")
+            rank_text = f"#{result['rank']}" if result['rank'] is not None else "unranked"
+            print(f"Rank: {rank_text} ({result['temperature']})")
             print(f"Score Gained: +{result['score_gain']:.2f}")
             if result['notes']:
                 print(f"Bonuses: {result['notes']}")
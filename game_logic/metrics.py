@@ -0,0 +1,178 @@
+import json
+import time
+import bisect
+import threading
+import functools
+from contextlib import contextmanager
+
+# Lightweight in-process instrumentation: counters and latency histograms,
+# exportable as a Prometheus text snapshot or JSON. Recording costs a lock and
+# a bisect, cheap enough to leave on; set Metrics().enabled = False to skip it.
+#
+# A profile hook can also be installed to receive the per-phase breakdown of
+# every guess (see GameSession.make_guess).
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+def _finite(value):
+    return None if value == float("inf") else value
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return BUCKETS[-1]
+
+
+class PhaseTimer:
+    """Times consecutive phases of one operation, e.g. the steps of a guess."""
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = self.last = time.perf_counter()
+        self.phases = {}
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = now - self.last
+        self.last = now
+
+    def finish(self, **details):
+        total = self.last - self.start
+        for phase, seconds in self.phases.items():
+            self.metrics.observe(f"{self.name}_phase_seconds", seconds, phase=phase, **self.labels)
+        self.metrics.observe(f"{self.name}_seconds", total, **self.labels)
+
+        hook = self.metrics.profile_hook
+        if hook is not None:
+            hook({"operation": self.name, "labels": self.labels, "phases": dict(self.phases),
+                  "total": total, **details})
+
+
+class Metrics:
+    _instance = None
+    _counters = {}     # (name, labels) -> value
+    _histograms = {}   # (name, labels) -> Histogram
+    _lock = threading.Lock()
+    enabled = True
+    profile_hook = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Metrics, cls).__new__(cls)
+        return cls._instance
+
+    # ─── Recording ───────────────────────────────────────────────────────────
+
+    def increment(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def phases(self, name, **labels):
+        return PhaseTimer(self, name, labels)
+
+    def set_profile_hook(self, hook):
+        """hook(dict) receives the phase breakdown of each profiled operation; None disables."""
+        Metrics.profile_hook = hook
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # ─── Export ──────────────────────────────────────────────────────────────
+
+    def snapshot(self):
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+            histograms = [
+                {"name": name, "labels": dict(labels), "count": h.count, "sum": h.total,
+                 "p50": _finite(h.quantile(0.5)), "p95": _finite(h.quantile(0.95)),
+                 "p99": _finite(h.quantile(0.99))}
+                for (name, labels), h in self._histograms.items()
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self):
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {h.total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def timed(name, **labels):
+    """Decorator recording the duration of every call in a histogram."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Metrics().timer(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,227 @@
+import sys
+import os
+import argparse
+import multiprocessing
+import numpy as np
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import embedding_store
+from game_logic.vector_db import VectorDB
+from game_logic.keyed_lock import KeyedLock
+
+# Offline goal-word precompute for a pack, stored in
+# word_list/precomputed/<language>/<pack>/:
+#   goals.txt       candidate goal words, one per line
+#   scores.npy      (goals, vocabulary rows) float16 similarity of each goal to every embedded word
+#   neighbours.npy  (goals, NEIGHBOURS) int32 rows sorted by similarity, goal itself excluded
+#   done.npy        (goals,) bool, rows already written; lets an interrupted run resume
+#   source.npy      (word count, size, mtime in ns) of the embedding store the rows come from
+# All of them are memory-mapped, so starting a game for a precomputed goal costs no computation.
+# Tables built from another version of the store are ignored until rebuilt.
+
+NEIGHBOURS = 1000
+
+def get_precompute_dir(language, pack):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, "word_list", "precomputed", language, pack)
+
+def get_store_source(language):
+    """(word count, size, mtime in ns) of the store VectorDB serves for language, or None."""
+    db = VectorDB()
+    signature = embedding_store.store_signature(db.get_store_path(language))
+    if signature is None:
+        return None
+    return (len(db.get_word_list(language)),) + signature
+
+
+class PrecomputeStore:
+    _instance = None
+    _opened = {}   # (language, pack) -> dict of memory maps, for the store they were built from
+    _load_locks = KeyedLock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PrecomputeStore, cls).__new__(cls)
+        return cls._instance
+
+    def _open(self, language, pack):
+        key = (language, pack)
+        source = get_store_source(language)
+        opened = self._opened.get(key)
+        if opened is not None and opened['source'] == source:
+            return opened
+        with self._load_locks(key):
+            opened = self._opened.get(key)
+            if opened is not None and opened['source'] == source:
+                return opened
+            # Not cached when missing or stale: a build may finish while the game runs
+            self._opened.pop(key, None)
+            opened = self._open_files(language, pack, source)
+            if opened is not None:
+                self._opened[key] = opened
+            return opened
+
+    def _open_files(self, language, pack, source):
+        folder = get_precompute_dir(language, pack)
+        if source is None or not os.path.exists(os.path.join(folder, "done.npy")):
+            return None
+        opened = None
+        try:
+            built_from = tuple(int(x) for x in np.load(os.path.join(folder, "source.npy")))
+            if built_from != source:
+                print(f"Ignoring precomputed pack {folder}: built from another embedding store, rebuild it")
+            else:
+                with open(os.path.join(folder, "goals.txt"), 'r', encoding='utf-8') as f:
+                    goals = [line.rstrip("\n") for line in f]
+                opened = {
+                    'goals': {word: i for i, word in enumerate(goals)},
+                    'scores': np.load(os.path.join(folder, "scores.npy"), mmap_mode='r'),
+                    'neighbours': np.load(os.path.join(folder, "neighbours.npy"), mmap_mode='r'),
+                    'done': np.load(os.path.join(folder, "done.npy"), mmap_mode='r'),
+                    'source': source,
+                }
+        except Exception as e:
+            print(f"Error loading precomputed pack {folder}: {e}")
+            opened = None
+        return opened
+
+    def get_goal(self, goal_word, language='en', pack='mixed'):
+        """
+        Returns (similarities, neighbours) for a precomputed goal word, or None.
+        similarities is a float16 row over VectorDB's rows for the language.
+        """
+        opened = self._open(language, pack)
+        if opened is None:
+            return None
+        i = opened['goals'].get(goal_word)
+        if i is None or not opened['done'][i]:
+            return None
+        return opened['scores'][i], opened['neighbours'][i]
+
+
+# ─── Batch builder ───────────────────────────────────────────────────────────
+
+_worker = {}
+
+def _init_worker(language, folder):
+    matrix = VectorDB().get_matrix(language)
+    _worker['matrix'] = matrix
+    _worker['scores'] = np.load(os.path.join(folder, "scores.npy"), mmap_mode='r+')
+    _worker['neighbours'] = np.load(os.path.join(folder, "neighbours.npy"), mmap_mode='r+')
+
+def _compute_chunk(task):
+    goal_indices, goal_rows = task
+    matrix = _worker['matrix']
+    scores = _worker['scores']
+    neighbours = _worker['neighbours']
+    k = neighbours.shape[1]
+
+    # matrix @ goals.T rather than goals @ matrix.T, so quantized stores work too
+    block = np.ascontiguousarray((matrix @ matrix[goal_rows].T).T)
+    block[np.arange(len(goal_rows)), goal_rows] = -np.inf
+    top = np.argpartition(block, -k, axis=1)[:, -k:]
+    top_scores = np.take_along_axis(block, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    block[np.arange(len(goal_rows)), goal_rows] = 1.0
+
+    scores[goal_indices] = block.astype(np.float16)
+    neighbours[goal_indices] = np.take_along_axis(top, order, axis=1).astype(np.int32)
+    scores.flush()
+    neighbours.flush()
+    return goal_indices
+
+def _read_pack(pack_path):
+    with open(pack_path, 'r', encoding='utf-8') as f:
+        return [line.strip().lower() for line in f if line.strip()]
+
+def build(language, pack_path, workers=None, chunk_size=64, neighbours=NEIGHBOURS):
+    db = VectorDB()
+    matrix = db.get_matrix(language)
+    if matrix is None or len(matrix) == 0:
+        print(f"No embeddings for {language}, nothing to precompute.")
+        return None
+
+    pack = os.path.splitext(os.path.basename(pack_path))[0]
+    folder = get_precompute_dir(language, pack)
+    os.makedirs(folder, exist_ok=True)
+
+    candidates = list(dict.fromkeys(_read_pack(pack_path)))
+    rows = db.get_word_rows(candidates, language)
+    goals = [w for w, r in zip(candidates, rows) if r >= 0]
+    goal_rows = rows[rows >= 0]
+    skipped = len(candidates) - len(goals)
+    if skipped:
+        print(f"Skipping {skipped} pack words without an embedding.")
+    if not goals:
+        return folder
+
+    n_rows = len(matrix)
+    k = min(neighbours, n_rows - 1)
+    goals_path = os.path.join(folder, "goals.txt")
+    scores_path = os.path.join(folder, "scores.npy")
+    neighbours_path = os.path.join(folder, "neighbours.npy")
+    done_path = os.path.join(folder, "done.npy")
+    source_path = os.path.join(folder, "source.npy")
+    source = get_store_source(language)
+    if source is None:
+        print(f"No embedding store on disk for {language}, nothing to precompute.")
+        return None
+
+    # Resume only if the previous run targeted the same goals and store
+    resume = False
+    if all(os.path.exists(p) for p in (goals_path, scores_path, neighbours_path, done_path, source_path)):
+        with open(goals_path, 'r', encoding='utf-8') as f:
+            previous_goals = [line.rstrip("\n") for line in f]
+        previous_scores = np.load(scores_path, mmap_mode='r')
+        previous_neighbours = np.load(neighbours_path, mmap_mode='r')
+        resume = (previous_goals == goals and previous_scores.shape == (len(goals), n_rows)
+                  and previous_neighbours.shape == (len(goals), k)
+                  and tuple(int(x) for x in np.load(source_path)) == source)
+        del previous_scores, previous_neighbours
+
+    if resume:
+        done = np.load(done_path, mmap_mode='r+')
+        print(f"Resuming: {int(done.sum())}/{len(goals)} goals already computed.")
+    else:
+        with open(goals_path, 'w', encoding='utf-8') as f:
+            for word in goals:
+                f.write(word + "\n")
+        np.lib.format.open_memmap(scores_path, mode='w+', dtype=np.float16, shape=(len(goals), n_rows))
+        np.lib.format.open_memmap(neighbours_path, mode='w+', dtype=np.int32, shape=(len(goals), k))
+        done = np.lib.format.open_memmap(done_path, mode='w+', dtype=bool, shape=(len(goals),))
+        np.save(source_path, np.array(source, dtype=np.int64))
+
+    pending = np.flatnonzero(~done)
+    tasks = [(pending[i:i + chunk_size], goal_rows[pending[i:i + chunk_size]])
+             for i in range(0, len(pending), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Precomputing {len(pending)} goals for {language}/{pack} on {workers} workers...")
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(language, folder)) as pool:
+        for finished in pool.imap_unordered(_compute_chunk, tasks):
+            done[finished] = True
+            done.flush()
+            print(f"  {int(done.sum())}/{len(goals)}")
+
+    print(f"Wrote {folder}")
+    return folder
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute goal-word similarity rows for a word pack.")
+    parser.add_argument("language", choices=["en", "fr", "ar"])
+    parser.add_argument("pack", help="pack name (e.g. sports) or path to a pack .txt file")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--neighbours", type=int, default=NEIGHBOURS)
+    args = parser.parse_args()
+
+    pack_path = args.pack
+    if not pack_path.endswith(".txt"):
+        pack_path = os.path.join(VectorDB().get_pack_dir(args.language), f"{args.pack}.txt")
+
+    build(args.language, pack_path, args.workers, args.chunk_size, args.neighbours)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import sys
+import os
+import time
+import json
+import argparse
+import numpy as np
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import embedding_store
+from game_logic.embedding_store import QuantizedMatrix
+from game_logic.engine import RANKED_WORDS
+from game_logic.vector_db import VectorDB
+
+# Writes float16 or int8 copies of a language's embedding store and reports
+# how far they drift from float32:
+#
+#   python game_logic/quantize.py en fr ar --dtype int8
+#
+# The copy is written next to the original (e.g. word_list/packs/mixed.int8)
+# and served with VectorDB().set_store_path(language, base_path).
+
+def get_quantized_path(language, dtype):
+    return os.path.join(VectorDB().get_pack_dir(language), f"mixed.{dtype}")
+
+def _top(scores, k):
+    top = np.argpartition(scores, -k)[-k:]
+    return top[np.argsort(scores[top])[::-1]]
+
+def drift_report(matrix, quantized, n_queries=200, top_k=10, ranked=RANKED_WORDS, seed=0):
+    """
+    Compares a quantized matrix with the float32 one it came from:
+    goal similarities (every word against a goal) and top-k neighbour lists.
+    """
+    n_rows = len(matrix)
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(n_rows, min(n_queries, n_rows), replace=False)
+    ranked = min(ranked, n_rows)
+    top_k = min(top_k, n_rows)
+
+    abs_errors, max_error, ranked_overlap, recall, top1 = [], 0.0, [], [], []
+    exact_ms, quantized_ms = [], []
+    for row in queries:
+        start = time.perf_counter()
+        exact = matrix @ np.asarray(matrix[row], dtype=np.float32)
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+        # The game holds both the goal and the guesses in the quantized store
+        start = time.perf_counter()
+        approx = quantized @ quantized[row]
+        quantized_ms.append((time.perf_counter() - start) * 1000)
+
+        error = np.abs(approx - exact)
+        abs_errors.append(float(error.mean()))
+        max_error = max(max_error, float(error.max()))
+
+        exact_ranked, approx_ranked = _top(exact, ranked), _top(approx, ranked)
+        ranked_overlap.append(len(np.intersect1d(exact_ranked, approx_ranked)) / ranked)
+        recall.append(len(np.intersect1d(exact_ranked[:top_k], approx_ranked[:top_k])) / top_k)
+        top1.append(exact_ranked[1] == approx_ranked[1] if ranked > 1 else True)
+
+    return {
+        'rows': n_rows,
+        'float32_mib': n_rows * matrix.shape[1] * 4 / 2 ** 20,
+        'quantized_mib': quantized.nbytes / 2 ** 20,
+        'goal_similarity_mean_abs_error': float(np.mean(abs_errors)),
+        'goal_similarity_max_abs_error': max_error,
+        f'top{ranked}_overlap': float(np.mean(ranked_overlap)),
+        f'recall@{top_k}': float(np.mean(recall)),
+        # index 0 is the query word itself
+        'nearest_neighbour_agreement': float(np.mean(top1)),
+        'float32_scan_ms_p50': float(np.percentile(exact_ms, 50)),
+        'quantized_scan_ms_p50': float(np.percentile(quantized_ms, 50)),
+    }
+
+def quantize_language(language, dtype, n_queries=200, top_k=10):
+    db = VectorDB()
+    matrix = db.get_matrix(language)
+    if matrix is None or len(matrix) == 0:
+        print(f"Skipping {language}: no embeddings")
+        return None
+    if isinstance(matrix, QuantizedMatrix):
+        print(f"Skipping {language}: it is already served from a quantized store")
+        return None
+
+    base_path = get_quantized_path(language, dtype)
+    embedding_store.write_store(base_path, db.get_word_list(language), matrix, dtype=dtype)
+    _, quantized = embedding_store.read_store(base_path)
+    report = {'language': language, 'dtype': dtype, 'store': base_path,
+              **drift_report(matrix, quantized, n_queries, top_k)}
+
+    print(f"[{language}] wrote {base_path}.npy ({dtype})")
+    print(f"  size: {report['float32_mib']:.1f} MiB -> {report['quantized_mib']:.1f} MiB")
+    print(f"  goal similarity error: mean {report['goal_similarity_mean_abs_error']:.5f}, "
+          f"max {report['goal_similarity_max_abs_error']:.5f}")
+    for key in report:
+        if key.startswith("top") or key.startswith("recall") or key == "nearest_neighbour_agreement":
+            print(f"  {key}: {report[key]:.3f}")
+    print(f"  scan p50: {report['float32_scan_ms_p50']:.2f} ms -> {report['quantized_scan_ms_p50']:.2f} ms")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Write quantized embedding stores and report their drift.")
+    parser.add_argument("languages", nargs="*", default=["en", "fr", "ar"])
+    parser.add_argument("--dtype", choices=list(embedding_store.QUANTIZED_DTYPES), default="int8")
+    parser.add_argument("--queries", type=int, default=200, help="goal words sampled for the report")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--output", default=None, help="write the reports as JSON")
+    args = parser.parse_args()
+
+    reports = [r for r in (quantize_language(language, args.dtype, args.queries, args.top_k)
+                           for language in args.languages) if r is not None]
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
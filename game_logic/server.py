@@ -0,0 +1,349 @@
+import sys
+import os
+import json
+import uuid
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic.engine import GameSession, BOT_CLASSES
+from game_logic.services import WordSimilarityService
+from game_logic.metrics import Metrics
+
+# Asyncio game server: many GameSessions in one event loop, over plain TCP with
+# one JSON object per line.
+#
+# Client -> server:
+#   {"action": "create", "name": "alice", "language": "en", "category": "sports", "bots": ["noob"]}
+#   {"action": "join", "room": "<room id>", "name": "bob"}
+#   {"action": "start"}
+#   {"action": "guess", "word": "football"}
+#   {"action": "leave"}
+#   {"action": "metrics"}
+# Server -> client events: created, joined, state, turn, guess, timeout, game_over, metrics, error.
+#
+# Model and bot work runs on a thread pool so a slow encode never stalls other
+# rooms; turn timers are asyncio timeouts.
+
+MAX_PLAYERS = 4
+LANGUAGES = ("en", "fr", "ar")
+PACKS = ("mixed", "sports", "history", "science", "computer_science")
+
+# field -> accepted JSON types; None means the field may be null
+FIELD_TYPES = {
+    "action": (str,),
+    "name": (str, type(None)),
+    "language": (str,),
+    "category": (str, type(None)),
+    "bots": (list, type(None)),
+    "room": (str,),
+    "word": (str,),
+}
+
+
+class Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.room = None
+        self.player_idx = None
+
+    async def send(self, message):
+        try:
+            self.writer.write((json.dumps(message) + "\n").encode('utf-8'))
+            await self.writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+
+
+class Room:
+    def __init__(self, room_id, session, creator):
+        self.room_id = room_id
+        self.session = session
+        self.creator = creator
+        self.clients = {}          # player_idx -> Client
+        self.guesses = asyncio.Queue()
+        self.current_idx = None
+        self.task = None
+
+    def state(self):
+        return {
+            "event": "state",
+            "room": self.room_id,
+            "language": self.session.language,
+            "category": self.session.category,
+            "started": self.task is not None,
+            "players": [
+                {"name": p.name, "score": p.score, "is_bot": p.is_bot, "difficulty": p.difficulty}
+                for p in self.session.players
+            ],
+        }
+
+    async def broadcast(self, message):
+        await asyncio.gather(*(client.send(message) for client in list(self.clients.values())))
+
+
+class GameServer:
+    def __init__(self, turn_seconds=30, workers=None, preload_model=False):
+        self.turn_seconds = turn_seconds
+        self.preload_model = preload_model
+        self.rooms = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def run_blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # ─── Connection handling ─────────────────────────────────────────────────
+
+    async def handle_client(self, reader, writer):
+        client = Client(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as e:
+                    await client.send({"event": "error", "error": f"Invalid message: {e}"})
+                    continue
+                try:
+                    await self.dispatch(client, message)
+                except (ConnectionError, asyncio.CancelledError):
+                    raise
+                except Exception as e:
+                    print(f"Server Error handling {message.get('action')!r}: {e!r}")
+                    await client.send({"event": "error", "error": "Internal error"})
+        except ConnectionError:
+            pass
+        finally:
+            await self.leave(client)
+            writer.close()
+
+    async def dispatch(self, client, message):
+        for field, types in FIELD_TYPES.items():
+            if field in message and not isinstance(message[field], types):
+                await client.send({"event": "error", "error": f"Invalid {field}"})
+                return
+
+        handlers = {
+            "create": self.create_room,
+            "join": self.join_room,
+            "start": self.start_game,
+            "guess": self.submit_guess,
+            "leave": self.leave,
+            "metrics": self.send_metrics,
+        }
+        handler = handlers.get(message.get("action"))
+        if handler is None:
+            await client.send({"event": "error", "error": f"Unknown action: {message.get('action')}"})
+            return
+        await handler(client, message)
+
+    async def send_metrics(self, client, message):
+        await client.send({"event": "metrics", "rooms": len(self.rooms), **Metrics().snapshot()})
+
+    # ─── Room lifecycle ──────────────────────────────────────────────────────
+
+    async def create_room(self, client, message):
+        if client.room is not None:
+            await client.send({"event": "error", "error": "Already in a room"})
+            return
+
+        language = message.get("language", "en")
+        category = message.get("category") or None
+        bots = message.get("bots") or []
+        # Both end up in file paths, so only known values get through
+        if language not in LANGUAGES:
+            await client.send({"event": "error", "error": "Invalid language"})
+            return
+        if category is not None and category not in PACKS:
+            await client.send({"event": "error", "error": "Invalid category"})
+            return
+        if any(not isinstance(b, str) or b not in BOT_CLASSES for b in bots) or len(bots) >= MAX_PLAYERS:
+            await client.send({"event": "error", "error": "Invalid bots"})
+            return
+
+        session = await self.run_blocking(
+            lambda: GameSession(language=language, category=category, preload_model=self.preload_model)
+        )
+        room = Room(uuid.uuid4().hex[:8], session, client)
+        self.rooms[room.room_id] = room
+
+        self._add_client(room, client, message.get("name") or "Player 1")
+        for i, difficulty in enumerate(bots):
+            await self.run_blocking(session.add_player, f"{difficulty.capitalize()} Bot {i + 1}", True, difficulty)
+
+        await client.send({"event": "created", "room": room.room_id})
+        await room.broadcast(room.state())
+
+    async def join_room(self, client, message):
+        room = self.rooms.get(message.get("room"))
+        if client.room is not None:
+            await client.send({"event": "error", "error": "Already in a room"})
+        elif room is None:
+            await client.send({"event": "error", "error": "Room not found"})
+        elif room.task is not None:
+            await client.send({"event": "error", "error": "Game already started"})
+        elif len(room.session.players) >= MAX_PLAYERS:
+            await client.send({"event": "error", "error": "Room is full"})
+        else:
+            name = message.get("name") or f"Player {len(room.session.players) + 1}"
+            self._add_client(room, client, name)
+            await client.send({"event": "joined", "room": room.room_id})
+            await room.broadcast(room.state())
+
+    def _add_client(self, room, client, name):
+        room.session.add_player(name)
+        client.room = room
+        client.player_idx = len(room.session.players) - 1
+        room.clients[client.player_idx] = client
+
+    async def start_game(self, client, message):
+        room = client.room
+        if room is None:
+            await client.send({"event": "error", "error": "Not in a room"})
+        elif room.creator is not client:
+            await client.send({"event": "error", "error": "Only the creator can start the game"})
+        elif room.task is None:
+            room.task = asyncio.create_task(self.play(room))
+
+    async def leave(self, client, message=None):
+        room = client.room
+        if room is None:
+            return
+        room.clients.pop(client.player_idx, None)
+        client.room = None
+        if not room.clients:
+            if room.task is not None:
+                room.task.cancel()
+            self.rooms.pop(room.room_id, None)
+        else:
+            await room.broadcast(room.state())
+
+    async def submit_guess(self, client, message):
+        room = client.room
+        if room is None or room.task is None:
+            await client.send({"event": "error", "error": "No game in progress"})
+        elif room.current_idx != client.player_idx:
+            await client.send({"event": "error", "error": "Not your turn"})
+        else:
+            room.guesses.put_nowait(str(message.get("word", "")))
+
+    # ─── Turn loop ───────────────────────────────────────────────────────────
+
+    async def _wait_for_guess(self, room, timeout):
+        if timeout is None:
+            return await room.guesses.get()
+        try:
+            return await asyncio.wait_for(room.guesses.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def play(self, room):
+        """Runs the room's game; whichever way it ends, the room is then closed to new players."""
+        try:
+            await self._play_turns(room)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Server Error in room {room.room_id}: {e!r}")
+            room.current_idx = None
+            await room.broadcast({
+                "event": "game_over",
+                "winner": None,
+                "goal_word": room.session.goal_word,
+                "scores": {p.name: p.score for p in room.session.players},
+                "error": "Game aborted by a server error",
+            })
+        finally:
+            self.rooms.pop(room.room_id, None)
+
+    async def _play_turns(self, room):
+        session = room.session
+        n_players = len(session.players)
+        # Like the terminal game, a single player has no turn timer
+        timeout = self.turn_seconds if n_players > 1 else None
+        turn = 0
+
+        while session.winner is None:
+            idx = turn % n_players
+            player = session.players[idx]
+            room.current_idx = idx
+            while not room.guesses.empty():
+                room.guesses.get_nowait()
+            await room.broadcast({"event": "turn", "player": player.name, "timeout": timeout})
+
+            if player.is_bot:
+                word = await self.run_blocking(session.get_bot_guess, idx)
+            elif idx not in room.clients:
+                word = None   # disconnected player
+            else:
+                word = await self._wait_for_guess(room, timeout)
+
+            if word is None:
+                await room.broadcast({"event": "timeout", "player": player.name})
+                turn += 1
+                continue
+            if not word.strip():
+                turn += 1
+                continue
+
+            result = await self.run_blocking(session.make_guess, idx, word)
+            if not result.get("is_valid", True) and not player.is_bot:
+                # Same as the terminal game: an unknown word does not use up the turn
+                if idx in room.clients:
+                    await room.clients[idx].send({"event": "error", "error": result["error"], "word": result["word"]})
+                continue
+
+            await room.broadcast({"event": "guess", "player": player.name, **result})
+            turn += 1
+
+        room.current_idx = None
+        await room.broadcast({
+            "event": "game_over",
+            "winner": session.winner.name,
+            "goal_word": session.goal_word,
+            "scores": {p.name: p.score for p in session.players},
+        })
+
+
+async def serve(host, port, turn_seconds, workers, batch_wait_ms, preload_model, backend=None):
+    if backend:
+        WordSimilarityService().configure_backend(**backend)
+    if batch_wait_ms > 0:
+        WordSimilarityService().enable_batching(max_wait=batch_wait_ms / 1000.0)
+
+    game_server = GameServer(turn_seconds, workers, preload_model)
+    server = await asyncio.start_server(game_server.handle_client, host, port)
+    print(f"Cemantix server listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Cemantix asyncio game server (JSON lines over TCP).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--turn-seconds", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=None, help="threads for model and bot work")
+    parser.add_argument("--batch-wait-ms", type=float, default=3, help="encode micro-batching window, 0 to disable")
+    parser.add_argument("--preload-model", action="store_true", help="load the model when a room is created")
+    parser.add_argument("--quantize-model", action="store_true", help="dynamic int8 quantization on CPU")
+    parser.add_argument("--model-threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--max-seq-length", type=int, default=None, help="token limit per word, e.g. 16")
+    args = parser.parse_args()
+
+    backend = {'quantize': args.quantize_model, 'threads': args.model_threads,
+               'max_seq_length': args.max_seq_length}
+    try:
+        asyncio.run(serve(args.host, args.port, args.turn_seconds, args.workers,
+                          args.batch_wait_ms, args.preload_model, backend))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,408 @@
+import gc
+import time
+import asyncio
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
+from game_logic.encode_scheduler import EncodeScheduler
+from game_logic.metrics import Metrics
+from game_logic.keyed_lock import KeyedLock
+from game_logic.disk_cache import get_disk_cache
 
 class WordSimilarityService:
     _instance = None
+    # Models are cached by model name; languages are aliases through _model_names,
+    # so fr and ar share one multilingual model
     _models = {}
+    _last_used = {}
+    _load_locks = KeyedLock()   # model name -> lock held while that model loads
     _model_names = {
         'en': 'all-MiniLM-L6-v2',
         'fr': 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
         'ar': 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
     }
+    # model name -> OrderedDict {word: normalized vector}, oldest entries first
+    _embedding_cache = {}
+    _cache_stats = {}
+    _cache_lock = threading.Lock()
+    cache_size = 50000
+    # Encoded words are also kept on disk, shared across runs and processes (disk_cache.py)
+    disk_cache = True
+    # model name -> EncodeScheduler, only when batching is enabled
+    _schedulers = {}
+    _batching = None
+    # CPU inference options applied to every model as it loads, see configure_backend
+    DEFAULT_BACKEND = {'quantize': False, 'threads': None, 'max_seq_length': None}
+    _backend = dict(DEFAULT_BACKEND)
+    _default_threads = None   # torch's thread count before a backend first changed it
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(WordSimilarityService, cls).__new__(cls)
         return cls._instance
 
+    def get_model_name(self, language):
+        return self._model_names.get(language, self._model_names['en'])
+
     def load_model(self, language):
-        if language not in self._models:
-            model_name = self._model_names.get(language, self._model_names['en'])
-            try:
-                print(f"Loading {language} model: {model_name}...")
-                self._models[language] = SentenceTransformer(model_name)
-                print(f"Model for {language} loaded.")
-            except Exception as e:
-                print(f"Error loading model for {language}: {e}")
+        """Thread-safe: concurrent callers wait for one load; loaded models are read without locking."""
+        model_name = self.get_model_name(language)
+        model = self._models.get(model_name)
+        if model is None:
+            with self._load_locks(model_name):
+                model = self._models.get(model_name)
+                if model is None:
+                    try:
+                        print(f"Loading {language} model: {model_name}...")
+                        with Metrics().timer("model_load_seconds", model=model_name):
+                            model = self._build_model(model_name, self._backend)
+                        self._models[model_name] = model
+                        print(f"Model for {language} loaded.")
+                    except Exception as e:
+                        print(f"Error loading model for {language}: {e}")
+                        return None
+        self._last_used[model_name] = time.monotonic()
+        return model
+
+    def _build_model(self, model_name, backend):
+        # Imported here so torch/transformers are only paid for when a model is needed
+        from sentence_transformers import SentenceTransformer
+
+        # Dynamic quantization only runs on CPU
+        model = SentenceTransformer(model_name, device='cpu' if backend['quantize'] else None)
+        if backend['max_seq_length']:
+            model.max_seq_length = backend['max_seq_length']
+        self._apply_threads(backend['threads'])
+        if backend['quantize']:
+            import torch
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+        return model
+
+    def _apply_threads(self, threads):
+        """Sets torch's process-wide thread count; None restores the one it had before any was set."""
+        if threads is None and WordSimilarityService._default_threads is None:
+            return
+        import torch
+        if WordSimilarityService._default_threads is None:
+            WordSimilarityService._default_threads = torch.get_num_threads()
+        torch.set_num_threads(threads or WordSimilarityService._default_threads)
+
+    # ─── Inference backend ───────────────────────────────────────────────────
+
+    def configure_backend(self, quantize=False, threads=None, max_seq_length=None):
+        """
+        CPU inference options for the models:
+        quantize:       torch dynamic int8 quantization of the Linear layers
+        threads:        torch intra-op thread count (process-wide)
+        max_seq_length: token limit per input; guesses are single words, so 16 is plenty
+        Loaded models and their cached embeddings are dropped, so the next
+        encode runs with the new options. Validate them with check_backend().
+        """
+        WordSimilarityService._backend = {
+            'quantize': quantize, 'threads': threads, 'max_seq_length': max_seq_length
+        }
+        for model_name in list(self._models):
+            self.unload(model_name=model_name)
+        self.clear_cache()
+        self._apply_threads(threads)
+
+    def check_backend(self, language='en', words=None, tolerance=0.02, n_words=200):
+        """
+        Compares the configured backend with the reference model on words
+        (by default a sample of the language's vocabulary). Reports the lowest
+        cosine between the two embeddings of a word, the largest change of any
+        word-to-word similarity, and the per-word encode time of each.
+        'ok' is True when the similarity change stays within tolerance.
+        """
+        from game_logic.vector_db import VectorDB
+
+        model_name = self.get_model_name(language)
+        if words is None:
+            vocabulary = VectorDB().get_word_list(language)
+            step = max(1, len(vocabulary) // n_words)
+            words = list(vocabulary[::step][:n_words]) or ["doctor", "medicine", "football", "river"]
+
+        candidate = self.load_model(language)
+        if candidate is None:
+            return None
+        reference = self._build_model(model_name, self.DEFAULT_BACKEND)
+
+        def encode(model):
+            vectors = np.asarray(model.encode(words), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            start = time.perf_counter()
+            for word in words[:50]:
+                model.encode([word])
+            return vectors, (time.perf_counter() - start) * 1000 / min(len(words), 50)
+
+        # The thread count is process-wide: time each model with its own
+        try:
+            self._apply_threads(None)
+            ref, ref_ms = encode(reference)
+        finally:
+            self._apply_threads(self._backend['threads'])
+        cand, cand_ms = encode(candidate)
+        del reference
+        gc.collect()
+
+        similarity_error = float(np.abs(ref @ ref.T - cand @ cand.T).max())
+        report = {
+            'language': language,
+            'model': model_name,
+            'backend': dict(self._backend),
+            'words': len(words),
+            'min_vector_cosine': float((ref * cand).sum(axis=1).min()),
+            'max_similarity_error': similarity_error,
+            'reference_ms_per_word': ref_ms,
+            'backend_ms_per_word': cand_ms,
+            'tolerance': tolerance,
+            'ok': similarity_error <= tolerance,
+        }
+        print(f"[{language}] {model_name} {report['backend']}: "
+              f"max similarity error {similarity_error:.4f} ({'ok' if report['ok'] else 'OVER'} {tolerance}), "
+              f"{ref_ms:.2f} -> {cand_ms:.2f} ms per word")
+        return report
+
+    # ─── Residency management ────────────────────────────────────────────────
+
+    def preload(self, languages):
+        """Loads the models of several languages; shared models are loaded once."""
+        for language in languages:
+            self.load_model(language)
+
+    def unload(self, language=None, model_name=None):
+        """Frees a model, given by language or by name. Cached embeddings are kept."""
+        model_name = model_name or self.get_model_name(language)
+        if self._models.pop(model_name, None) is None:
+            return False
+        self._last_used.pop(model_name, None)
+        gc.collect()
+        print(f"Unloaded model {model_name}.")
+        return True
+
+    def _model_bytes(self, model):
+        try:
+            tensors = list(model.parameters()) + list(model.buffers())
+            return sum(t.numel() * t.element_size() for t in tensors)
+        except Exception:
+            return 0
+
+    def get_memory_usage(self):
+        """
+        Per loaded model: the languages it serves, its parameter/buffer bytes,
+        the bytes of its embedding cache and how long it has been idle.
+        """
+        now = time.monotonic()
+        usage = {}
+        for model_name, model in self._models.items():
+            cache = self._embedding_cache.get(model_name, {})
+            usage[model_name] = {
+                'languages': [lang for lang, name in self._model_names.items() if name == model_name],
+                'model_bytes': self._model_bytes(model),
+                'cache_bytes': sum(v.nbytes for v in cache.values()),
+                'idle_seconds': now - self._last_used.get(model_name, now),
+            }
+        return usage
+
+    def evict_idle(self, max_idle_seconds):
+        """Unloads every model not used for max_idle_seconds. Returns their names."""
+        now = time.monotonic()
+        idle = [name for name in self._models
+                if now - self._last_used.get(name, now) >= max_idle_seconds]
+        for model_name in idle:
+            self.unload(model_name=model_name)
+        return idle
+
+    def evict_to_budget(self, max_bytes):
+        """Unloads least recently used models until the loaded ones fit in max_bytes."""
+        evicted = []
+        usage = self.get_memory_usage()
+        total = sum(u['model_bytes'] for u in usage.values())
+        for model_name in sorted(usage, key=lambda name: self._last_used.get(name, 0)):
+            if total <= max_bytes:
+                break
+            total -= usage[model_name]['model_bytes']
+            self.unload(model_name=model_name)
+            evicted.append(model_name)
+        return evicted
+
+    # ─── Encoding ─────────────────────────────────────────────────────────────
+
+    def enable_batching(self, max_wait=0.003, max_batch=64):
+        """
+        Routes cache misses from every session through one EncodeScheduler per
+        model, which encodes the words pending within max_wait seconds (or
+        max_batch of them) in a single model.encode call.
+        """
+        self.disable_batching()
+        WordSimilarityService._batching = (max_wait, max_batch)
+
+    def disable_batching(self):
+        with self._cache_lock:
+            WordSimilarityService._batching = None
+            schedulers = list(self._schedulers.values())
+            self._schedulers.clear()
+        # Outside the lock: close() waits for the batches in flight
+        for scheduler in schedulers:
+            scheduler.close()
+
+    def _get_scheduler(self, language):
+        """The model's EncodeScheduler, or None if batching is off."""
+        model_name = self.get_model_name(language)
+        with self._cache_lock:
+            if self._batching is None:
                 return None
-        return self._models[language]
+            scheduler = self._schedulers.get(model_name)
+            if scheduler is None:
+                max_wait, max_batch = self._batching
+                scheduler = EncodeScheduler(
+                    lambda words: self.load_model(language).encode(words),
+                    max_batch=max_batch, max_wait=max_wait
+                )
+                self._schedulers[model_name] = scheduler
+        return scheduler
 
-    def compute_similarity(self, word1, word2, language='en'):
-        model = self.load_model(language)
+    def _lookup(self, words, model_name):
+        """Returns ({word: cached vector}, [missing words]) and updates the counters."""
+        result = {}
+        missing = []
+        with self._cache_lock:
+            cache = self._embedding_cache.setdefault(model_name, OrderedDict())
+            stats = self._cache_stats.setdefault(model_name, {'hits': 0, 'misses': 0})
+            for word in words:
+                if word in result or word in missing:
+                    continue
+                vec = cache.get(word)
+                if vec is not None:
+                    cache.move_to_end(word)
+                    stats['hits'] += 1
+                    result[word] = vec
+                else:
+                    stats['misses'] += 1
+                    missing.append(word)
+        metrics = Metrics()
+        metrics.increment("embedding_cache_hits_total", len(result), model=model_name)
+        metrics.increment("embedding_cache_misses_total", len(missing), model=model_name)
+        return result, missing
+
+    def _store(self, words, embeddings, model_name, result):
+        with self._cache_lock:
+            cache = self._embedding_cache.setdefault(model_name, OrderedDict())
+            for word, vec in zip(words, embeddings):
+                vec = np.asarray(vec, dtype=np.float32)
+                norm = np.linalg.norm(vec)
+                if norm > 0:
+                    vec = vec / norm
+                cache[word] = vec
+                result[word] = vec
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def get_embeddings(self, words, language='en'):
+        """
+        Returns the normalized embedding of each word, in order.
+        Only words missing from the cache are encoded, in a single batch.
+        """
+        model_name = self.get_model_name(language)
+        result, missing = self._lookup(words, model_name)
+        if missing:
+            missing = self._lookup_disk(missing, language, model_name, result)
+
+        if missing:
+            model = self.load_model(language)
+            if not model:
+                return [None] * len(words)
+            with Metrics().timer("encode_seconds", model=model_name):
+                scheduler = self._get_scheduler(language)
+                if scheduler is not None:
+                    embeddings = scheduler.encode(missing)
+                else:
+                    embeddings = model.encode(missing)
+            Metrics().increment("encoded_words_total", len(missing), model=model_name)
+            self._store(missing, embeddings, model_name, result)
+            if self._persists_encodes():
+                get_disk_cache(language, model_name).append(missing, [result[w] for w in missing])
+
+        return [result[word] for word in words]
+
+    def _persists_encodes(self):
+        """
+        Only the reference backend's vectors go to the disk cache: it is shared
+        by every backend and compact() folds it into the embedding store.
+        """
+        return self.disk_cache and self._backend == self.DEFAULT_BACKEND
+
+    def _lookup_disk(self, words, language, model_name, result):
+        """Fills result from the disk cache; returns the words still missing."""
+        if not self.disk_cache:
+            return words
+        found = get_disk_cache(language, model_name).lookup(words)
+        if not found:
+            return words
+        Metrics().increment("embedding_disk_cache_hits_total", len(found), model=model_name)
+        self._store(list(found), list(found.values()), model_name, result)
+        return [w for w in words if w not in found]
+
+    def get_embedding(self, word, language='en'):
+        return self.get_embeddings([word], language)[0]
+
+    async def get_embedding_async(self, word, language='en'):
+        """
+        asyncio version of get_embedding. Misses are awaited on the batching
+        scheduler, or run in the default executor when batching is off.
+        """
+        model_name = self.get_model_name(language)
+        result, missing = self._lookup([word], model_name)
+        if missing:
+            missing = self._lookup_disk(missing, language, model_name, result)
+        if not missing:
+            return result[word]
+
+        loop = asyncio.get_running_loop()
+        if self._batching is None:
+            return await loop.run_in_executor(None, self.get_embedding, word, language)
+
+        model = await loop.run_in_executor(None, self.load_model, language)
         if not model:
+            return None
+        scheduler = self._get_scheduler(language)
+        if scheduler is None:
+            return await loop.run_in_executor(None, self.get_embedding, word, language)
+        vector = await scheduler.encode_async(word)
+        self._store([word], [vector], model_name, result)
+        if self._persists_encodes():
+            get_disk_cache(language, model_name).append([word], [result[word]])
+        return result[word]
+
+    def get_cache_stats(self, language='en'):
+        model_name = self.get_model_name(language)
+        stats = self._cache_stats.get(model_name, {'hits': 0, 'misses': 0})
+        return {
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'size': len(self._embedding_cache.get(model_name, ())),
+            'max_size': self.cache_size
+        }
+
+    def clear_cache(self, language=None):
+        with self._cache_lock:
+            if language is None:
+                self._embedding_cache.clear()
+                self._cache_stats.clear()
+            else:
+                model_name = self.get_model_name(language)
+                self._embedding_cache.pop(model_name, None)
+                self._cache_stats.pop(model_name, None)
+
+    def compute_similarity(self, word1, word2, language='en'):
+        v1, v2 = self.get_embeddings([word1, word2], language)
+        if v1 is None or v2 is None:
             return 0.0
-        
-        embeddings = model.encode([word1, word2])
-        # Cosine similarity
-        similarity = np.dot(embeddings[0], embeddings[1]) / (np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1]))
-        return float(similarity)
+
+        # Cached vectors are normalized, so the dot product is the cosine similarity
+        return float(np.dot(v1, v2))
 
     def get_similarity_to_goal(self, guess_word, goal_word, language='en'):
         return self.compute_similarity(guess_word, goal_word, language)
@@ -0,0 +1,132 @@
+import os
+import sys
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic.vector_db import VectorDB
+from game_logic.embedding_store import QuantizedMatrix
+
+# Shares VectorDB languages between processes through multiprocessing.shared_memory.
+#
+# The loader process publishes each language once:
+#     handles = publish_all(["en", "fr"])
+# and every worker (e.g. as a pool initializer) attaches to the same blocks:
+#     attach_all(handles)
+# Workers map the matrix read-only without copying it, so its memory is paid
+# once however many workers there are. Each worker still builds its own word
+# list and word -> row dict, which are small next to the matrix.
+# Quantized languages are shared as they are stored (int8 + scales, or float16).
+
+_blocks = {}   # language -> (handle, [blocks]), kept open while served
+
+def _open_block(name, publisher_pid):
+    block = shared_memory.SharedMemory(name=name)
+    # Before Python 3.13 attaching registers the block with this process'
+    # resource tracker, which unlinks it on exit. Children of the publisher
+    # share its tracker, any other process must opt out.
+    if os.getppid() != publisher_pid and os.getpid() != publisher_pid:
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+def _share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[:] = array
+    return block
+
+def _view(block, shape, dtype):
+    array = np.ndarray(tuple(shape), dtype=dtype, buffer=block.buf)
+    array.setflags(write=False)
+    return array
+
+def publish(language):
+    """
+    Copies a language's matrix and words into shared memory and returns a
+    picklable handle for attach(). The publisher keeps serving the shared copy.
+    """
+    if language in _blocks:
+        return _blocks[language][0]
+
+    db = VectorDB()
+    matrix = db.get_matrix(language)
+    if matrix is None:
+        print(f"SharedStore Error: no embeddings loaded for {language}")
+        return None
+    words = db.get_word_list(language)
+
+    scales = None
+    if isinstance(matrix, QuantizedMatrix):
+        matrix, scales = matrix.data, matrix.scales
+    else:
+        matrix = np.asarray(matrix, dtype=np.float32)
+    blob = np.frombuffer("\n".join(words).encode('utf-8'), dtype=np.uint8)
+
+    blocks = [_share(matrix), _share(blob)] + ([_share(scales)] if scales is not None else [])
+    handle = {
+        "language": language,
+        "blocks": [block.name for block in blocks],
+        "shape": list(matrix.shape),
+        "dtype": matrix.dtype.str,
+        "words_size": len(blob),
+        "pid": os.getpid(),
+    }
+    _blocks[language] = (handle, blocks)
+    _serve(handle, blocks)
+    return handle
+
+def _serve(handle, blocks):
+    matrix = _view(blocks[0], handle["shape"], handle["dtype"])
+    if len(blocks) == 3:
+        matrix = QuantizedMatrix(matrix, _view(blocks[2], handle["shape"][:1], np.float32))
+    elif matrix.dtype == np.float16:
+        matrix = QuantizedMatrix(matrix)
+
+    size = handle["words_size"]
+    words = bytes(blocks[1].buf[:size]).decode('utf-8').split("\n") if size else []
+    VectorDB().set_data(handle["language"], words, matrix)
+
+def attach(handle):
+    """Serves handle's language from the published blocks, read-only and without copying."""
+    language = handle["language"]
+    if language in _blocks:
+        return
+
+    blocks = [_open_block(name, handle["pid"]) for name in handle["blocks"]]
+    _blocks[language] = (handle, blocks)
+    _serve(handle, blocks)
+
+def publish_all(languages):
+    handles = []
+    for language in languages:
+        handle = publish(language)
+        if handle is not None:
+            handles.append(handle)
+    return handles
+
+def attach_all(handles):
+    """Pool initializer: attaches every published language."""
+    for handle in handles:
+        attach(handle)
+
+def release(language=None):
+    """
+    Stops serving shared languages (all by default). The publisher also frees
+    the blocks, so call it there only once every worker is done.
+    """
+    languages = [language] if language else list(_blocks)
+    for lang in languages:
+        entry = _blocks.pop(lang, None)
+        if entry is None:
+            continue
+        handle, blocks = entry
+        VectorDB().unload(lang)
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass   # arrays over it are still referenced; the mapping goes with them
+            if handle["pid"] == os.getpid():
+                block.unlink()
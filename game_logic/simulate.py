@@ -0,0 +1,175 @@
+import sys
+import os
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Ensure we can import from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic.engine import GameSession, BOT_CLASSES
+from game_logic import shared_store
+
+# Headless bot-vs-bot tournament. Games are spread over a process pool and
+# every game is seeded from (seed, game index), so a run is reproducible.
+# Reports guesses-to-solve, win rates and per-turn latency percentiles per
+# language, pack and bot.
+
+PACKS = ["mixed", "sports", "history", "science", "computer_science"]
+
+def play_game(spec):
+    """Plays one game; returns per-bot results and per-turn latencies."""
+    game_id, seed, language, pack, lineup, max_turns = spec
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+
+    category = None if pack == "mixed" else pack
+    session = GameSession(language=language, category=category, preload_model=False)
+    for i, difficulty in enumerate(lineup):
+        session.add_player(f"{difficulty}-{i + 1}", is_bot=True, difficulty=difficulty)
+
+    turns = {i: [] for i in range(len(lineup))}
+    invalid = [0] * len(lineup)
+    turn = 0
+    while session.winner is None and turn < max_turns:
+        idx = turn % len(lineup)
+
+        start = time.perf_counter()
+        word = session.get_bot_guess(idx)
+        decided = time.perf_counter()
+        result = session.make_guess(idx, word)
+        scored = time.perf_counter()
+
+        turns[idx].append(((decided - start) * 1000, (scored - decided) * 1000))
+        if not result.get("is_valid", True):
+            invalid[idx] += 1
+        turn += 1
+
+    return {
+        "game": game_id,
+        "language": language,
+        "pack": pack,
+        "goal_word": session.goal_word,
+        "turns": turn,
+        "bots": [
+            {
+                "difficulty": difficulty,
+                "won": session.winner is session.players[i],
+                "guesses": len(turns[i]),
+                "invalid": invalid[i],
+                "score": session.players[i].score,
+                "decision_ms": [t[0] for t in turns[i]],
+                "guess_ms": [t[1] for t in turns[i]],
+            }
+            for i, difficulty in enumerate(lineup)
+        ],
+    }
+
+def _percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+def summarize(games):
+    groups = {}
+    for game in games:
+        for bot in game["bots"]:
+            key = (game["language"], game["pack"], bot["difficulty"])
+            group = groups.setdefault(key, {"games": 0, "wins": 0, "solve_guesses": [],
+                                            "invalid": 0, "guesses": 0,
+                                            "decision_ms": [], "guess_ms": []})
+            group["games"] += 1
+            group["guesses"] += bot["guesses"]
+            group["invalid"] += bot["invalid"]
+            group["decision_ms"].extend(bot["decision_ms"])
+            group["guess_ms"].extend(bot["guess_ms"])
+            if bot["won"]:
+                group["wins"] += 1
+                group["solve_guesses"].append(bot["guesses"])
+
+    summary = []
+    for (language, pack, difficulty), group in sorted(groups.items()):
+        solve = group["solve_guesses"]
+        summary.append({
+            "language": language,
+            "pack": pack,
+            "bot": difficulty,
+            "games": group["games"],
+            "win_rate": group["wins"] / group["games"],
+            "guesses_to_solve_mean": float(np.mean(solve)) if solve else None,
+            "guesses_to_solve_median": float(np.median(solve)) if solve else None,
+            "invalid_rate": group["invalid"] / max(group["guesses"], 1),
+            "decision_ms": _percentiles(group["decision_ms"]),
+            "guess_ms": _percentiles(group["guess_ms"]),
+        })
+    return summary
+
+def run(games, languages, packs, lineup, workers=None, seed=0, max_turns=200, shared_memory=False):
+    """shared_memory: load the embeddings once and let every worker attach to them"""
+    specs = []
+    for i in range(games):
+        language = languages[i % len(languages)]
+        pack = packs[(i // len(languages)) % len(packs)]
+        specs.append((i, seed * 1_000_003 + i, language, pack, lineup, max_turns))
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_game(spec) for spec in specs]
+    else:
+        handles = shared_store.publish_all(languages) if shared_memory else []
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=shared_store.attach_all,
+                                     initargs=(handles,)) as pool:
+                results = list(pool.map(play_game, specs, chunksize=max(1, len(specs) // (4 * (workers or os.cpu_count() or 1)))))
+        finally:
+            shared_store.release()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "config": {"games": games, "languages": languages, "packs": packs, "lineup": lineup,
+                   "seed": seed, "max_turns": max_turns, "workers": workers,
+                   "shared_memory": shared_memory},
+        "elapsed_seconds": elapsed,
+        "summary": summarize(results),
+        "games": results,
+    }
+
+def print_summary(report):
+    print(f"{report['config']['games']} games in {report['elapsed_seconds']:.1f} s")
+    print(f"{'lang':<5}{'pack':<18}{'bot':<8}{'games':>6}{'win%':>7}{'solve':>7}"
+          f"{'dec p50':>9}{'dec p99':>9}{'guess p50':>10}{'guess p99':>10}")
+    for row in report["summary"]:
+        solve = row["guesses_to_solve_median"]
+        print(f"{row['language']:<5}{row['pack']:<18}{row['bot']:<8}{row['games']:>6}"
+              f"{100 * row['win_rate']:>6.1f}%{(f'{solve:.0f}' if solve else '-'):>7}"
+              f"{row['decision_ms']['p50'] or 0:>8.2f}ms{row['decision_ms']['p99'] or 0:>7.2f}ms"
+              f"{row['guess_ms']['p50'] or 0:>8.2f}ms{row['guess_ms']['p99'] or 0:>8.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless bot tournament and bot-strength benchmark.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--languages", nargs="+", default=["en", "fr", "ar"])
+    parser.add_argument("--packs", nargs="+", default=PACKS)
+    parser.add_argument("--bots", nargs="+", default=["noob", "pro", "hacker"], choices=list(BOT_CLASSES))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="workers attach to one shared copy of the embeddings")
+    parser.add_argument("--output", default=None, help="write the full JSON report here")
+    args = parser.parse_args()
+
+    report = run(args.games, args.languages, args.packs, args.bots,
+                 args.workers, args.seed, args.max_turns, args.shared_memory)
+    print_summary(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,30 @@
 import os
-import csv
+import time
 import numpy as np
+from game_logic import embedding_store
+from game_logic.ann_index import IVFIndex, get_index_path
+from game_logic.metrics import Metrics
+from game_logic.word_registry import WordRegistry
+from game_logic.keyed_lock import KeyedLock
 
 class VectorDB:
     _instance = None
-    _vectors = {}
     _words = {}
+    _index = {}   # language -> {word: row in _matrix}
     _matrix = {}
+    _ann = {}     # language -> IVFIndex, only for languages that opted in
+    _store_paths = {}  # language -> store base path overriding the pack's mixed store
+    _pack_rows = {}    # (language, pack) -> (pack words, matrix, sorted rows of the embedded ones)
+    _load_locks = KeyedLock()   # language -> lock held while it loads
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(VectorDB, cls).__new__(cls)
         return cls._instance
 
-    def load_data(self, language='en'):
-        if language in self._vectors:
-            return
-
+    def get_pack_dir(self, language='en'):
         base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        file_name = "mixed.csv"
-        
+
         if language == 'fr':
              folder = "packs_fr"
         elif language == 'ar':
@@ -27,101 +32,283 @@ class VectorDB:
         else:
              folder = "packs"
 
-        csv_path = os.path.join(base_path, "word_list", folder, file_name)
+        return os.path.join(base_path, "word_list", folder)
+
+    def get_store_path(self, language='en'):
+        """Base path (without extension) of the embedding store used for a language."""
+        return self._store_paths.get(language) or os.path.join(self.get_pack_dir(language), "mixed")
+
+    def set_store_path(self, language, base_path):
+        """
+        Serves a language from another store, e.g. a full vocabulary built with
+        game_logic/embed_vocab.py. Drops whatever was loaded for it before.
+        """
+        self._store_paths[language] = base_path
+        self.unload(language)
+
+    def set_data(self, language, words, matrix):
+        """Serves a language from an in-memory word list and normalized matrix."""
+        # One contiguous matrix; words are looked up through their row.
+        # _matrix is filled last: readers take a language as loaded once it is there.
+        self._words[language] = words
+        self._index[language] = {word: i for i, word in enumerate(words)}
+        self._matrix[language] = matrix
+        self._ann.pop(language, None)
+        self._drop_pack_rows(language)
+
+    def unload(self, language):
+        self._matrix.pop(language, None)
+        self._words.pop(language, None)
+        self._index.pop(language, None)
+        self._ann.pop(language, None)
+        self._drop_pack_rows(language)
 
-        if not os.path.exists(csv_path):
-            print(f"VectorDB Error: Embedding file not found at {csv_path}")
+    def _drop_pack_rows(self, language):
+        # list(): another thread may be adding a pack meanwhile
+        for key in [k for k in list(self._pack_rows) if k[0] == language]:
+            self._pack_rows.pop(key, None)
+
+    def load_data(self, language='en'):
+        """Thread-safe: concurrent callers wait for one load of the language."""
+        if language in self._matrix:
             return
+        with self._load_locks(language):
+            if language not in self._matrix:
+                self._load(language)
 
-        print(f"Loading embeddings from {csv_path}...")
-        vectors = {}
-        words_list = []
-        matrix_list = []
+    def _load(self, language):
+        start = time.perf_counter()
+        store_path = self.get_store_path(language)
+        csv_path = store_path + ".csv"
 
         try:
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if len(row) < 2:
-                        continue
-                    word = row[0].strip().lower()
-                    try:
-                        vec = np.array([float(x) for x in row[1:]], dtype=np.float32)
-                        # Normalize vector
-                        norm = np.linalg.norm(vec)
-                        if norm > 0:
-                            vec = vec / norm
-                        
-                        vectors[word] = vec
-                        words_list.append(word)
-                        matrix_list.append(vec)
-                    except ValueError:
-                        continue
-            
-            self._vectors[language] = vectors
-            self._words[language] = words_list
-            self._matrix[language] = np.array(matrix_list)
-            print(f"Loaded {len(vectors)} words for {language} (Normalized).")
+            if embedding_store.store_is_current(store_path, csv_path):
+                print(f"Loading embeddings from {store_path}.npy...")
+                words_list, matrix = embedding_store.read_store(store_path)
+            elif os.path.exists(csv_path):
+                print(f"Loading embeddings from {csv_path}...")
+                words_list, matrix = embedding_store.read_csv(csv_path)
+                matrix.setflags(write=False)
+                # Convert once so the next start can memory-map the binary store
+                try:
+                    embedding_store.write_store(store_path, words_list, matrix)
+                    print(f"Saved binary embedding store to {store_path}.npy")
+                except OSError as e:
+                    print(f"Could not save binary embedding store: {e}")
+            else:
+                print(f"VectorDB Error: Embedding file not found at {csv_path}")
+                return
+
+            self.set_data(language, words_list, matrix)
+            Metrics().observe("vector_db_load_seconds", time.perf_counter() - start, language=language)
+            print(f"Loaded {len(self._index[language])} words for {language} (Normalized).")
             
         except Exception as e:
             print(f"Error loading embeddings: {e}")
 
     def get_word_vector(self, word, language='en'):
-        if language not in self._vectors:
+        """Returns a read-only view of the word's row, or None if it has no embedding."""
+        if language not in self._matrix:
+            self.load_data(language)
+        row = self._index.get(language, {}).get(word.lower())
+        if row is None:
+            return None
+        return self._matrix[language][row]
+
+    def get_word_row(self, word, language='en'):
+        """Returns the word's row in the language matrix, or None if it has no embedding."""
+        if language not in self._matrix:
             self.load_data(language)
-        return self._vectors.get(language, {}).get(word.lower())
+        return self._index.get(language, {}).get(word.lower())
+
+    def get_word_rows(self, words, language='en'):
+        """Returns the matrix row of each word, -1 for words without an embedding."""
+        if language not in self._matrix:
+            self.load_data(language)
+        index = self._index.get(language, {})
+        return np.fromiter((index.get(w.lower(), -1) for w in words), dtype=np.int64, count=len(words))
+
+    def get_word_vectors(self, words, language='en'):
+        """
+        Gathers the vectors of several words in one go.
+        Returns (vectors, found): a (len(found), dim) matrix and the positions
+        in words that have an embedding, in order.
+        """
+        rows = self.get_word_rows(words, language)
+        found = np.flatnonzero(rows >= 0)
+        matrix = self._matrix.get(language)
+        if matrix is None:
+            return np.empty((0, 0), dtype=np.float32), found
+        return matrix[rows[found]], found
 
     def get_word_list(self, language='en'):
         if language not in self._words:
             self.load_data(language)
         return self._words.get(language, [])
 
+    def get_matrix(self, language='en'):
+        """The normalized (n_words, dim) embedding matrix, rows ordered like get_word_list."""
+        if language not in self._matrix:
+            self.load_data(language)
+        return self._matrix.get(language)
+
+    def use_ann(self, language='en', enabled=True, n_probe=None):
+        """
+        Switches a language between the exact scan and the prebuilt ANN index
+        (see game_logic/ann_index.py). Returns True if the index is active.
+        """
+        if not enabled:
+            self._ann.pop(language, None)
+            return False
+
+        path = get_index_path(language)
+        if not os.path.exists(path):
+            print(f"VectorDB Error: ANN index not found at {path}")
+            return False
+
+        matrix = self.get_matrix(language)
+        if matrix is None:
+            return False
+        index = IVFIndex.load(path)
+        stale = index.stale_reason(matrix, embedding_store.store_signature(self.get_store_path(language)))
+        if stale:
+            print(f"VectorDB Error: ANN index {path} is stale ({stale}); rebuild it with "
+                  f"python game_logic/ann_index.py build {language}")
+            return False
+        if n_probe:
+            index.n_probe = n_probe
+        self._ann[language] = index
+        return True
+
     def get_nearest_word(self, vector, language='en', top_k=10):
+        words, _ = self.search(vector, language, top_k=top_k)
+        return words
+
+    def search(self, vector, language='en', top_k=10, exclude=None, candidates=None, pack=None):
+        """
+        Finds the top_k words closest to vector.
+
+        exclude:    iterable of words, or a boolean mask over the language's rows,
+                    marking words that must not be returned (e.g. already guessed)
+        candidates: optional array of row indices to restrict the search to
+        pack:       optional pack name ("sports", ...) to search only its words;
+                    None, "mixed" or a pack with no embedded words searches everything
+        Returns (words, scores), best match first.
+        """
+        rows, scores = self.search_rows(vector, language, top_k, exclude, candidates, pack)
+        words = self._words.get(language)
+        return [words[i] for i in rows], scores
+
+    def search_rows(self, vector, language='en', top_k=10, exclude=None, candidates=None, pack=None):
+        """Same as search, but returns (rows of the language matrix, scores)."""
         if language not in self._matrix:
             self.load_data(language)
+
+        if candidates is None and pack and pack != "mixed":
+            pack_rows = self.get_pack_rows(pack, language)
+            if len(pack_rows):
+                candidates = pack_rows
         
+        start = time.perf_counter()
         matrix = self._matrix.get(language)
-        words = self._words.get(language)
+        no_match = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
         
-        if matrix is None or len(matrix) == 0:
-            return []
+        if matrix is None or len(matrix) == 0 or top_k <= 0:
+            return no_match
+
+        # Match the matrix dtype, a float64 query would upcast the whole matrix
+        vector = np.asarray(vector, dtype=np.float32)
 
         # Normalize input vector if needed
         norm_v = np.linalg.norm(vector)
         if norm_v == 0:
-            return []
+            return no_match
         
         if abs(norm_v - 1.0) > 1e-6:
             vector = vector / norm_v
-        
-        # Calculate cosine similarity
-        cosine_sims = np.dot(matrix, vector)
-        
-        # Get indices of top_k
-        top_indices = np.argsort(cosine_sims)[-top_k:][::-1]
-        
-        return [words[i] for i in top_indices]
 
-    def get_pack_words(self, pack_name, language='en'):
-        """Loads words from a specific pack text file."""
-        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        if language == 'fr':
-             folder = "packs_fr"
-        elif language == 'ar':
-             folder = "packs_ar"
+        excluded = self._exclusion_mask(exclude, language)
+
+        mode = "exact" if candidates is None else "subset"
+        if candidates is None and language in self._ann:
+            candidates = self._ann[language].shortlist(vector, top_k, excluded)
+            mode = "ann"
+
+        # Calculate cosine similarity over the searched rows only
+        if candidates is None:
+            rows = None
+            cosine_sims = matrix @ vector
         else:
-             folder = "packs"
-             
-        file_path = os.path.join(base_path, "word_list", folder, f"{pack_name}.txt")
+            rows = np.asarray(candidates, dtype=np.int64)
+            cosine_sims = matrix[rows] @ vector
+            if excluded is not None:
+                excluded = excluded[rows]
+
+        if excluded is not None:
+            cosine_sims = np.where(excluded, -np.inf, cosine_sims)
+            available = len(cosine_sims) - int(np.count_nonzero(excluded))
+        else:
+            available = len(cosine_sims)
+
+        k = min(top_k, available)
+        if k <= 0:
+            return no_match
+
+        # O(N) selection of the top k, then sort only those k
+        if k < len(cosine_sims):
+            top = np.argpartition(cosine_sims, -k)[-k:]
+        else:
+            top = np.arange(len(cosine_sims))
+        top = top[np.argsort(cosine_sims[top])[::-1]]
+
+        scores = cosine_sims[top]
+        if rows is not None:
+            top = rows[top]
+        Metrics().observe("vector_search_seconds", time.perf_counter() - start, language=language, mode=mode)
+        return top, scores
+
+    def _exclusion_mask(self, exclude, language):
+        if exclude is None:
+            return None
+        if isinstance(exclude, np.ndarray) and exclude.dtype == bool:
+            return exclude
+
+        rows = self.get_word_rows(list(exclude), language)
+        mask = np.zeros(len(self._matrix[language]), dtype=bool)
+        mask[rows[rows >= 0]] = True
+        return mask
+
+    def get_pack_words(self, pack_name, language='en'):
+        """Words of a specific pack text file, as a cached tuple."""
+        file_path = os.path.join(self.get_pack_dir(language), f"{pack_name}.txt")
         
         if not os.path.exists(file_path):
-            return []
-            
-        words = []
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                words = [line.strip().lower() for line in f if line.strip()]
-        except Exception:
-            pass
-        return words
+            return ()
+        return WordRegistry().get_word_list(file_path)
+
+    def get_pack_rows(self, pack_name, language='en'):
+        """
+        Sub-index of a pack: sorted rows of the language matrix holding the
+        pack's embedded words, for searches limited to that pack.
+        """
+        if language not in self._matrix:
+            self.load_data(language)
+
+        pack_words = self.get_pack_words(pack_name, language)
+        key = (language, pack_name)
+        # The registry hands back the same tuple until the pack file changes,
+        # and the rows are only valid for the matrix they were looked up in
+        entry = self._pack_rows.get(key)
+        if entry is not None and entry[0] is pack_words and entry[1] is self._matrix.get(language):
+            return entry[2]
+
+        with self._load_locks(key):
+            matrix = self._matrix.get(language)
+            entry = self._pack_rows.get(key)
+            if entry is not None and entry[0] is pack_words and entry[1] is matrix:
+                return entry[2]
+            rows = self.get_word_rows(pack_words, language)
+            rows = np.unique(rows[rows >= 0])
+            rows.setflags(write=False)
+            self._pack_rows[key] = (pack_words, matrix, rows)
+        return rows
@@ -0,0 +1,60 @@
+import os
+from game_logic.keyed_lock import KeyedLock
+
+class WordRegistry:
+    """
+    Process-wide cache of word files (vocabularies and packs).
+    Every GameSession shares the same immutable frozenset / tuple for a file
+    instead of loading its own copy. Files are re-read when their mtime changes.
+    Thread-safe: a file is read once however many threads ask for it at the same time.
+    """
+    _instance = None
+    _entries = {}   # (path, kind) -> (mtime, words)
+    _load_locks = KeyedLock()   # (path, kind) -> lock held while the file is read
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(WordRegistry, cls).__new__(cls)
+        return cls._instance
+
+    def _get(self, filepath, kind):
+        try:
+            mtime = os.path.getmtime(filepath)
+        except OSError:
+            mtime = None
+
+        key = (filepath, kind)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with self._load_locks(key):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+            words = self._read(filepath)
+            words = frozenset(words) if kind == 'set' else tuple(words)
+            self._entries[key] = (mtime, words)
+        return words
+
+    def _read(self, filepath):
+        if not os.path.exists(filepath):
+            print(f"Warning: File not found: {filepath}")
+            return []
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return [line.strip().lower() for line in f if line.strip()]
+        except Exception as e:
+            print(f"Error loading {filepath}: {e}")
+            return []
+
+    def get_word_list(self, filepath):
+        """Words of the file in order, as a shared tuple."""
+        return self._get(filepath, 'list')
+
+    def get_word_set(self, filepath):
+        """Words of the file as a shared frozenset, for membership checks."""
+        return self._get(filepath, 'set')
+
+    def clear(self):
+        self._entries.clear()